@@ -6,12 +6,9 @@ FirefoxController - Main package initialization
 This package provides a Python interface to control Firefox using its remote debugging protocol.
 """
 
-# Patch Firefox's libxul.so on import to make WebDriver undetectable
-from .webdriver_patch import WebDriverPatchError, check_and_raise_if_needed
-# check_and_raise_if_needed()
-
 from .interface import FirefoxRemoteDebugInterface
 from .execution_manager import FirefoxExecutionManager
+from .pool import FirefoxPool
 from .exceptions import (
     FirefoxControllerException,
     FirefoxStartupException,
@@ -40,6 +37,7 @@ from .bidi_types import (
 __all__ = [
     'FirefoxRemoteDebugInterface',
     'FirefoxExecutionManager',
+    'FirefoxPool',
     'FirefoxControllerException',
     'FirefoxStartupException',
     'FirefoxConnectFailure',
@@ -66,5 +64,19 @@ __all__ = [
     'validate_log_source'
 ]
 
-# Import utility functions from the original firefox_controller.py
-from .utils import setup_logging, main, find_available_port
\ No newline at end of file
+# Utility functions (the CLI entry point lives in utils)
+from .utils import setup_logging, main, find_available_port
+
+
+# The libxul.so WebDriver patch is only needed for stealth use, so its module
+# is imported on first access to one of these names rather than at package import.
+_WEBDRIVER_PATCH_EXPORTS = ('WebDriverPatchError', 'check_and_raise_if_needed')
+
+
+def __getattr__(name):
+    if name in _WEBDRIVER_PATCH_EXPORTS:
+        from . import webdriver_patch
+        value = getattr(webdriver_patch, name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -7,12 +7,14 @@ This module provides type validation and utility functions for WebDriver-BiDi pr
 implementation based on the W3C specification: https://www.w3.org/TR/webdriver-bidi/
 """
 
+import functools
 import json
 import re
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional, Union, Type, Tuple
 from enum import Enum
 from datetime import datetime
-import base64
+from binascii import a2b_base64
 
 
 class BiDiTypeError(TypeError):
@@ -92,6 +94,88 @@ class LogSource(Enum):
     JAVASCRIPT = "javascript"
 
 
+def _enum_lookup(enum_cls: Type[Enum]) -> Tuple[frozenset, tuple]:
+    """
+    Build the value lookup table for an Enum class.
+
+    Args:
+        enum_cls: The Enum class
+
+    Returns:
+        (frozenset of member values, tuple of member values in declaration order)
+    """
+    valid = tuple(member.value for member in enum_cls)
+    return frozenset(valid), valid
+
+
+def _enum_value(enum_cls: Type[Enum], value: Any) -> Any:
+    """
+    Slow path for the validators: normalize value through the Enum class.
+
+    Accepts Enum members as well as raw values, like EnumClass(value).value.
+
+    Args:
+        enum_cls: The Enum class
+        value: Value or member to normalize
+
+    Returns:
+        The member's value, or _MISSING if value isn't a valid member or value
+    """
+    try:
+        return enum_cls(value).value
+    except (ValueError, TypeError):
+        return _MISSING
+
+
+# Precomputed value sets for the validators below. A frozenset membership test
+# is a single hash probe, where EnumClass(value) goes through Enum.__call__ and
+# raises/catches ValueError on every miss. The tuples keep declaration order for
+# error messages. Validators test membership inline rather than through a
+# shared helper so the happy path stays a single probe with no extra call;
+# misses (including Enum members and unhashable values) go through _enum_value.
+_BROWSING_CONTEXT_TYPE_VALUES, _BROWSING_CONTEXT_TYPE_VALID = _enum_lookup(BrowsingContextType)
+_NAVIGATION_TYPE_VALUES, _NAVIGATION_TYPE_VALID = _enum_lookup(NavigationType)
+_SCRIPT_RESULT_TYPE_VALUES, _SCRIPT_RESULT_TYPE_VALID = _enum_lookup(ScriptResultType)
+_NETWORK_PHASE_VALUES, _NETWORK_PHASE_VALID = _enum_lookup(NetworkPhase)
+_COOKIE_SAME_SITE_VALUES, _COOKIE_SAME_SITE_VALID = _enum_lookup(CookieSameSite)
+_LOG_LEVEL_VALUES, _LOG_LEVEL_VALID = _enum_lookup(LogLevel)
+_LOG_SOURCE_VALUES, _LOG_SOURCE_VALID = _enum_lookup(LogSource)
+
+# Sentinel for dict.get() where None is a meaningful value
+_MISSING = object()
+
+# Cookie field -> (expected type, description for errors). sameSite has no
+# type entry because it is checked by validate_cookie_same_site.
+_COOKIE_FIELD_SPECS = {
+    'name': (str, 'a string'),
+    'value': (str, 'a string'),
+    'domain': (str, 'str'),
+    'path': (str, 'str'),
+    'secure': (bool, 'bool'),
+    'httpOnly': (bool, 'bool'),
+    'sameSite': (None, None),
+    'expiry': (int, 'int'),
+}
+
+# Required fields of a screenshot clip region, in error-reporting order
+_CLIP_REGION_FIELDS = ('x', 'y', 'width', 'height')
+
+# Types json.dumps encodes directly (also the types it accepts as dict keys)
+_JSON_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# Fixed value lists that are not backed by an Enum
+_SCREENSHOT_FORMATS = ('png', 'jpeg', 'webp')
+_RESPONSE_TYPES = ('success', 'error', 'exception')
+
+
+# URL prefixes accepted by validate_url (str.startswith takes the whole tuple)
+_URL_SCHEMES = ('http://', 'https://', 'about:', 'data:')
+
+# Browsing context IDs are UUID-like tokens (Firefox uses plain UUIDs, some
+# implementations wrap them in braces). Length bounds match the old check.
+_CONTEXT_ID_RE = re.compile(r'[A-Za-z0-9._{}-]{10,100}\Z')
+
+
 def validate_browsing_context_type(context_type: str) -> str:
     """
     Validate browsing context type.
@@ -106,10 +190,14 @@ def validate_browsing_context_type(context_type: str) -> str:
         BiDiTypeError: If the context type is invalid
     """
     try:
-        return BrowsingContextType(context_type).value
-    except ValueError:
-        valid_types = [t.value for t in BrowsingContextType]
-        raise BiDiTypeError("Invalid browsing context type '{}'. Valid types: {}".format(context_type, valid_types))
+        if context_type in _BROWSING_CONTEXT_TYPE_VALUES:
+            return context_type
+    except TypeError:
+        pass
+    value = _enum_value(BrowsingContextType, context_type)
+    if value is not _MISSING:
+        return value
+    raise BiDiTypeError("Invalid browsing context type '{}'. Valid types: {}".format(context_type, _BROWSING_CONTEXT_TYPE_VALID))
 
 
 def validate_navigation_type(navigation_type: str) -> str:
@@ -126,10 +214,14 @@ def validate_navigation_type(navigation_type: str) -> str:
         BiDiTypeError: If the navigation type is invalid
     """
     try:
-        return NavigationType(navigation_type).value
-    except ValueError:
-        valid_types = [t.value for t in NavigationType]
-        raise BiDiTypeError("Invalid navigation type '{}'. Valid types: {}".format(navigation_type, valid_types))
+        if navigation_type in _NAVIGATION_TYPE_VALUES:
+            return navigation_type
+    except TypeError:
+        pass
+    value = _enum_value(NavigationType, navigation_type)
+    if value is not _MISSING:
+        return value
+    raise BiDiTypeError("Invalid navigation type '{}'. Valid types: {}".format(navigation_type, _NAVIGATION_TYPE_VALID))
 
 
 def validate_network_phases(phases: List[str]) -> List[str]:
@@ -145,14 +237,20 @@ def validate_network_phases(phases: List[str]) -> List[str]:
     Raises:
         BiDiTypeError: If any phase is invalid
     """
-    valid_phases = []
-    for phase in phases:
-        try:
-            valid_phases.append(NetworkPhase(phase).value)
-        except ValueError:
-            valid_phase_values = [p.value for p in NetworkPhase]
-            raise BiDiTypeError("Invalid network phase '{}'. Valid phases: {}".format(phase, valid_phase_values))
-    return valid_phases
+    # Copy first so iterators are only consumed once; the subset test then
+    # runs entirely in C and the per-item scan is only needed for the error.
+    phase_list = list(phases)
+    try:
+        if _NETWORK_PHASE_VALUES.issuperset(phase_list):
+            return phase_list
+    except TypeError:
+        pass
+    # Slow path: normalize Enum members, and find the invalid (or unhashable) phases
+    values = [_enum_value(NetworkPhase, phase) for phase in phase_list]
+    invalid_phases = [phase for phase, value in zip(phase_list, values) if value is _MISSING]
+    if not invalid_phases:
+        return values
+    raise BiDiTypeError("Invalid network phases {}. Valid phases: {}".format(invalid_phases, _NETWORK_PHASE_VALID))
 
 
 def validate_cookie_same_site(same_site: str) -> str:
@@ -169,10 +267,14 @@ def validate_cookie_same_site(same_site: str) -> str:
         BiDiTypeError: If the SameSite value is invalid
     """
     try:
-        return CookieSameSite(same_site).value
-    except ValueError:
-        valid_values = [s.value for s in CookieSameSite]
-        raise BiDiTypeError("Invalid SameSite value '{}'. Valid values: {}".format(same_site, valid_values))
+        if same_site in _COOKIE_SAME_SITE_VALUES:
+            return same_site
+    except TypeError:
+        pass
+    value = _enum_value(CookieSameSite, same_site)
+    if value is not _MISSING:
+        return value
+    raise BiDiTypeError("Invalid SameSite value '{}'. Valid values: {}".format(same_site, _COOKIE_SAME_SITE_VALID))
 
 
 def validate_url(url: str) -> str:
@@ -188,11 +290,13 @@ def validate_url(url: str) -> str:
     Raises:
         BiDiValidationError: If the URL is invalid
     """
-    if not url or not isinstance(url, str):
+    # Check the type before truthiness so arbitrary objects are never asked
+    # for their bool value; exact str is the common case and skips isinstance.
+    if (type(url) is not str and not isinstance(url, str)) or not url:
         raise BiDiValidationError("URL must be a non-empty string")
     
-    # Basic URL validation - should start with http://, https://, or about:
-    if not (url.startswith('http://') or url.startswith('https://') or url.startswith('about:') or url.startswith('data:')):
+    # Basic URL validation - should start with one of the allowed schemes
+    if not url.startswith(_URL_SCHEMES):
         raise BiDiValidationError("Invalid URL format: {}".format(url))
     
     return url
@@ -214,28 +318,21 @@ def validate_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(cookie, dict):
         raise BiDiValidationError("Cookie must be a dictionary")
     
-    required_fields = ['name', 'value']
-    for field in required_fields:
-        if field not in cookie:
-            raise BiDiValidationError("Cookie missing required field: {}".format(field))
-        if not isinstance(cookie[field], str):
-            raise BiDiValidationError("Cookie field '{}' must be a string".format(field))
-    
-    optional_fields = {
-        'domain': str,
-        'path': str,
-        'secure': bool,
-        'httpOnly': bool,
-        'sameSite': str,
-        'expiry': int
-    }
+    if 'name' not in cookie:
+        raise BiDiValidationError("Cookie missing required field: name")
+    if 'value' not in cookie:
+        raise BiDiValidationError("Cookie missing required field: value")
     
-    for field, expected_type in optional_fields.items():
-        if field in cookie:
-            if field == 'sameSite':
-                validate_cookie_same_site(cookie[field])
-            elif not isinstance(cookie[field], expected_type):
-                raise BiDiValidationError("Cookie field '{}' must be {}".format(field, expected_type.__name__))
+    # One pass over the fields actually present; unknown fields pass through
+    for field, field_value in cookie.items():
+        spec = _COOKIE_FIELD_SPECS.get(field)
+        if spec is None:
+            continue
+        expected_type, type_desc = spec
+        if expected_type is None:
+            validate_cookie_same_site(field_value)
+        elif type(field_value) is not expected_type and not isinstance(field_value, expected_type):
+            raise BiDiValidationError("Cookie field '{}' must be {}".format(field, type_desc))
     
     return cookie
 
@@ -253,10 +350,13 @@ def validate_screenshot_format(format: str) -> str:
     Raises:
         BiDiTypeError: If the format is invalid
     """
-    valid_formats = ['png', 'jpeg', 'webp']
-    if format.lower() not in valid_formats:
-        raise BiDiTypeError("Invalid screenshot format '{}'. Valid formats: {}".format(format, valid_formats))
-    return format.lower()
+    # Callers almost always pass the canonical lowercase name
+    if format in _SCREENSHOT_FORMATS:
+        return format
+    lowered = format.lower()
+    if lowered not in _SCREENSHOT_FORMATS:
+        raise BiDiTypeError("Invalid screenshot format '{}'. Valid formats: {}".format(format, _SCREENSHOT_FORMATS))
+    return lowered
 
 
 def validate_clip_region(clip: Dict[str, int]) -> Dict[str, int]:
@@ -275,11 +375,25 @@ def validate_clip_region(clip: Dict[str, int]) -> Dict[str, int]:
     if not isinstance(clip, dict):
         raise BiDiValidationError("Clip region must be a dictionary")
     
-    required_fields = ['x', 'y', 'width', 'height']
-    for field in required_fields:
+    # Fast path: all four fields present as non-negative plain ints. The
+    # bitwise OR of ints is negative iff any operand is, so one compare covers
+    # all four sign checks. Anything else (int subclasses included) is decided
+    # by the slow path.
+    x = clip.get('x')
+    y = clip.get('y')
+    width = clip.get('width')
+    height = clip.get('height')
+    if (type(x) is int and type(y) is int and type(width) is int and type(height) is int and
+            (x | y | width | height) >= 0):
+        return clip
+    
+    # Slow path: report the first offending field
+    for field in _CLIP_REGION_FIELDS:
         if field not in clip:
             raise BiDiValidationError("Clip region missing required field: {}".format(field))
-        if not isinstance(clip[field], int) or clip[field] < 0:
+        value = clip[field]
+        # True/False are ints too, but not meaningful as coordinates
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
             raise BiDiValidationError("Clip region field '{}' must be a non-negative integer".format(field))
     
     return clip
@@ -299,10 +413,14 @@ def validate_script_result_type(result_type: str) -> str:
         BiDiTypeError: If the result type is invalid
     """
     try:
-        return ScriptResultType(result_type).value
-    except ValueError:
-        valid_types = [t.value for t in ScriptResultType]
-        raise BiDiTypeError("Invalid script result type '{}'. Valid types: {}".format(result_type, valid_types))
+        if result_type in _SCRIPT_RESULT_TYPE_VALUES:
+            return result_type
+    except TypeError:
+        pass
+    value = _enum_value(ScriptResultType, result_type)
+    if value is not _MISSING:
+        return value
+    raise BiDiTypeError("Invalid script result type '{}'. Valid types: {}".format(result_type, _SCRIPT_RESULT_TYPE_VALID))
 
 
 def parse_script_result(response: Dict[str, Any]) -> Any:
@@ -323,47 +441,91 @@ def parse_script_result(response: Dict[str, Any]) -> Any:
         raise BiDiValidationError("Response must be a dictionary")
     
     # Check for exception
-    if response.get('type') == 'exception':
+    response_type = response.get('type')
+    if response_type == 'exception':
         return None
     
-    if response.get('type') != 'success':
-        raise BiDiValidationError("Invalid response type: {}".format(response.get('type')))
+    if response_type != 'success':
+        raise BiDiValidationError("Invalid response type: {}".format(response_type))
     
-    if 'result' not in response:
+    result_obj = response.get('result', _MISSING)
+    if result_obj is _MISSING:
         raise BiDiValidationError("Response missing 'result' field")
     
-    result_obj = response['result']
-    
     # Handle nested structure for real WebDriver-BiDi responses
-    if isinstance(result_obj, dict) and 'result' in result_obj:
-        result_obj = result_obj['result']
-    
-    # Handle special types
     if isinstance(result_obj, dict):
-        if result_obj.get('type') == 'undefined':
-            return None
-        elif result_obj.get('type') == 'null':
-            return None
-        elif result_obj.get('type') == 'object':
-            # Handle complex objects
-            if 'value' in result_obj and isinstance(result_obj['value'], list):
-                # Convert array of key-value pairs to dictionary
-                result_dict = {}
-                for key, value_obj in result_obj['value']:
-                    if isinstance(value_obj, dict) and 'value' in value_obj:
-                        result_dict[key] = value_obj['value']
-                    else:
-                        result_dict[key] = value_obj
-                return result_dict
-        elif 'type' in result_obj and 'value' in result_obj:
-            # Handle simple types (string, number, boolean, etc.)
-            return result_obj['value']
-        elif 'value' in result_obj:
-            return result_obj['value']
+        result_obj = result_obj.get('result', result_obj)
     
+    return parse_result_value(result_obj)
+
+
+def _parse_none_result(result_obj: Dict[str, Any]) -> None:
+    """Handle 'undefined' and 'null' script results."""
+    return None
+
+
+def _parse_object_result(result_obj: Dict[str, Any]) -> Any:
+    """Handle 'object' script results serialized as key-value pairs."""
+    value = result_obj.get('value')
+    if not isinstance(value, list):
+        return result_obj
+
+    # Convert array of key-value pairs to dictionary
+    result_dict = {}
+    for key, value_obj in value:
+        if isinstance(value_obj, dict) and 'value' in value_obj:
+            result_dict[key] = value_obj['value']
+        else:
+            result_dict[key] = value_obj
+    return result_dict
+
+
+def _parse_simple_result(result_obj: Dict[str, Any]) -> Any:
+    """Handle simple types (string, number, boolean, etc.)."""
+    if 'value' in result_obj:
+        return result_obj['value']
     return result_obj
 
 
+# Script result handlers keyed on the remote value 'type' field. Anything not
+# listed here is treated as a simple value.
+_RESULT_TYPE_HANDLERS = {
+    'undefined': _parse_none_result,
+    'null': _parse_none_result,
+    'object': _parse_object_result,
+}
+
+
+def parse_result_value(result_obj: Any) -> Any:
+    """
+    Convert a WebDriver-BiDi remote value into a Python value.
+
+    This is the part of parse_script_result() that handles the value itself,
+    for callers that have already unwrapped the response envelope.
+
+    Args:
+        result_obj: The remote value (the innermost 'result' of a script response)
+
+    Returns:
+        Parsed value, or result_obj unchanged if it is not a remote value dict
+    """
+    if not isinstance(result_obj, dict):
+        return result_obj
+    handler = _RESULT_TYPE_HANDLERS.get(result_obj.get('type'), _parse_simple_result)
+    return handler(result_obj)
+
+
+@functools.lru_cache(maxsize=256)
+def _is_context_id_format(context_id: str) -> bool:
+    """
+    Check a context ID against _CONTEXT_ID_RE.
+
+    There are only as many distinct IDs as open browsing contexts, and the same
+    IDs are validated on every command, so the result is cached.
+    """
+    return _CONTEXT_ID_RE.match(context_id) is not None
+
+
 def validate_browsing_context_id(context_id: str) -> str:
     """
     Validate browsing context ID.
@@ -377,11 +539,11 @@ def validate_browsing_context_id(context_id: str) -> str:
     Raises:
         BiDiValidationError: If the context ID is invalid
     """
-    if not context_id or not isinstance(context_id, str):
+    if (type(context_id) is not str and not isinstance(context_id, str)) or not context_id:
         raise BiDiValidationError("Browsing context ID must be a non-empty string")
     
-    # Basic UUID validation - should be a reasonable format
-    if len(context_id) < 10 or len(context_id) > 100:
+    # Basic UUID validation - charset and length are both checked by the regex
+    if not _is_context_id_format(context_id):
         raise BiDiValidationError("Invalid browsing context ID format: {}".format(context_id))
     
     return context_id
@@ -420,11 +582,51 @@ def validate_base64_data(data: str) -> bytes:
         BiDiValidationError: If the data is not valid base64
     """
     try:
-        return base64.b64decode(data)
+        # binascii.a2b_base64 is what base64.b64decode calls after its
+        # Python-level argument coercion; it accepts str and bytes directly.
+        return a2b_base64(data)
     except (TypeError, ValueError) as e:
         raise BiDiValidationError("Invalid base64 data: {}".format(e))
 
 
+def _is_json_serializable(data: Any) -> bool:
+    """
+    Check whether data only contains types the json module can encode.
+
+    Walks the structure with an explicit stack, so deep nesting costs no
+    Python frames. A container reached a second time (a shared or circular
+    reference) stops the walk, and the caller lets json.dumps decide.
+
+    Args:
+        data: Data to check
+
+    Returns:
+        True if json.dumps(data) would succeed with the default encoder,
+        False if it would fail or the walk gave up
+    """
+    stack = [data]
+    seen = set()
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _JSON_SCALAR_TYPES):
+            continue
+        if isinstance(item, dict):
+            for key in item:
+                if not isinstance(key, _JSON_SCALAR_TYPES):
+                    return False
+            values = item.values()
+        elif isinstance(item, (list, tuple)):
+            values = item
+        else:
+            return False
+        item_id = id(item)
+        if item_id in seen:
+            return False
+        seen.add(item_id)
+        stack.extend(values)
+    return True
+
+
 def validate_json_data(data: Any) -> Any:
     """
     Validate JSON-serializable data.
@@ -438,6 +640,11 @@ def validate_json_data(data: Any) -> Any:
     Raises:
         BiDiValidationError: If the data is not JSON-serializable
     """
+    # Fast path: walk the structure without building the serialized string
+    if _is_json_serializable(data):
+        return data
+
+    # Slow path: json.dumps gives the precise error message
     try:
         json.dumps(data)
         return data
@@ -445,119 +652,208 @@ def validate_json_data(data: Any) -> Any:
         raise BiDiValidationError("Data is not JSON-serializable: {}".format(e))
 
 
-class BiDiTypeValidator:
+# Python types and descriptions for the schema 'type' strings checked by
+# validate_method_parameters. 'enum' is handled separately via 'values'.
+_PARAM_TYPE_CHECKS = {
+    'string': (str, 'a string'),
+    'number': ((int, float), 'a number'),
+    'integer': (int, 'an integer'),
+    'boolean': (bool, 'a boolean'),
+    'array': (list, 'an array'),
+    'object': (dict, 'an object'),
+}
+
+# id(parameter schema) -> (schema, compiled validator), filled in for every
+# schema in METHOD_SCHEMAS at import time
+_COMPILED_PARAM_VALIDATORS = {}
+
+
+def _compile_param_validator(schema: Dict[str, Any]):
     """
-    WebDriver-BiDi type validator utility class.
+    Compile a parameter schema into a validator function.
+
+    The schema is interpreted once and turned into the source of a function
+    with one straight-line block per parameter, so a call only performs the
+    isinstance checks and validator calls that apply, with no schema lookups
+    or type-string dispatch.
+
+    Args:
+        schema: Parameter validation schema (param name -> param schema)
+
+    Returns:
+        Function taking (method_name, params) and returning validated parameters
+    """
+    # Per-parameter objects are passed to the generated code through its
+    # globals (n0 = name, t0 = type, e0 = enum values, f0 = validator, ...)
+    namespace = {'BiDiValidationError': BiDiValidationError, '_MISSING': _MISSING}
+    lines = [
+        'def validate(method_name, params):',
+        '    if not isinstance(params, dict):',
+        '        raise BiDiValidationError("{} parameters must be a dictionary".format(method_name))',
+        '    validated_params = {}',
+    ]
+
+    for index, (param_name, param_schema) in enumerate(schema.items()):
+        name, value = 'n{}'.format(index), 'v{}'.format(index)
+        namespace[name] = param_name
+        lines.append('    {} = params.get({}, _MISSING)'.format(value, name))
+        if param_schema.get('required', False):
+            lines.append('    if {} is _MISSING:'.format(value))
+            lines.append('        raise BiDiValidationError("Missing required parameter \'{{}}\' for method {{}}".format({}, method_name))'.format(name))
+            indent = '    '
+        else:
+            lines.append('    if {} is not _MISSING:'.format(value))
+            indent = '        '
+
+        param_type = param_schema.get('type')
+        if param_type in _PARAM_TYPE_CHECKS:
+            expected_type, type_desc = _PARAM_TYPE_CHECKS[param_type]
+            namespace['t{}'.format(index)] = expected_type
+            lines.append('{}if not isinstance({}, t{}):'.format(indent, value, index))
+            lines.append('{}    raise BiDiValidationError("Parameter \'{{}}\' must be {}".format({}))'.format(indent, type_desc, name))
+        elif param_type == 'enum':
+            namespace['e{}'.format(index)] = param_schema.get('values', [])
+            lines.append('{}if {} not in e{}:'.format(indent, value, index))
+            lines.append('{0}    raise BiDiValidationError("Parameter \'{{}}\' must be one of: {{}}".format({1}, e{2}))'.format(indent, name, index))
+
+        validator = param_schema.get('validator')
+        if callable(validator):
+            namespace['f{}'.format(index)] = validator
+            lines.append('{}{} = f{}({})'.format(indent, value, index, value))
+
+        lines.append('{}validated_params[{}] = {}'.format(indent, name, value))
+
+    lines.append('    return validated_params')
+    exec('\n'.join(lines), namespace)
+    return namespace['validate']
+
+
+def _interpret_param_schema(method_name: str, params: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate parameters by walking the schema directly.
+
+    Used for ad-hoc schemas that weren't registered at import time. Compiling
+    those on every call would cost far more than the walk, and caching them
+    would go stale if the caller's (mutable) schema dict changes.
+
+    Args:
+        method_name: Name of the WebDriver-BiDi method
+        params: Parameters to validate
+        schema: Parameter validation schema (param name -> param schema)
+
+    Returns:
+        Validated parameters
+    """
+    if not isinstance(params, dict):
+        raise BiDiValidationError("{} parameters must be a dictionary".format(method_name))
+
+    validated_params = {}
+    for param_name, param_schema in schema.items():
+        param_value = params.get(param_name, _MISSING)
+        if param_value is _MISSING:
+            if param_schema.get('required', False):
+                raise BiDiValidationError("Missing required parameter '{}' for method {}".format(param_name, method_name))
+            continue
+
+        param_type = param_schema.get('type')
+        if param_type in _PARAM_TYPE_CHECKS:
+            expected_type, type_desc = _PARAM_TYPE_CHECKS[param_type]
+            if not isinstance(param_value, expected_type):
+                raise BiDiValidationError("Parameter '{}' must be {}".format(param_name, type_desc))
+        elif param_type == 'enum':
+            valid_values = param_schema.get('values', [])
+            if param_value not in valid_values:
+                raise BiDiValidationError("Parameter '{}' must be one of: {}".format(param_name, valid_values))
+
+        validator = param_schema.get('validator')
+        if callable(validator):
+            param_value = validator(param_value)
+
+        validated_params[param_name] = param_value
+    return validated_params
+
+
+def _register_param_validator(schema: Dict[str, Any]):
+    """Compile a parameter schema and register it for validate_method_parameters."""
+    _COMPILED_PARAM_VALIDATORS[id(schema)] = (schema, _compile_param_validator(schema))
+
+
+def validate_method_parameters(method_name: str, params: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
     """
+    Validate method parameters against a schema.
     
-    @staticmethod
-    def validate_method_parameters(method_name: str, params: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Validate method parameters against a schema.
-        
-        Args:
-            method_name: Name of the WebDriver-BiDi method
-            params: Parameters to validate
-            schema: Validation schema
-            
-        Returns:
-            Validated parameters
-            
-        Raises:
-            BiDiValidationError: If validation fails
-        """
-        if not isinstance(params, dict):
-            raise BiDiValidationError("{} parameters must be a dictionary".format(method_name))
-        
-        validated_params = {}
-        
-        for param_name, param_schema in schema.items():
-            if param_name not in params:
-                if param_schema.get('required', False):
-                    raise BiDiValidationError("Missing required parameter '{}' for method {}".format(param_name, method_name))
-                else:
-                    continue
-            
-            param_value = params[param_name]
-            param_type = param_schema.get('type')
-            
-            # Validate type
-            if param_type:
-                if param_type == 'string':
-                    if not isinstance(param_value, str):
-                        raise BiDiValidationError("Parameter '{}' must be a string".format(param_name))
-                elif param_type == 'number':
-                    if not isinstance(param_value, (int, float)):
-                        raise BiDiValidationError("Parameter '{}' must be a number".format(param_name))
-                elif param_type == 'integer':
-                    if not isinstance(param_value, int):
-                        raise BiDiValidationError("Parameter '{}' must be an integer".format(param_name))
-                elif param_type == 'boolean':
-                    if not isinstance(param_value, bool):
-                        raise BiDiValidationError("Parameter '{}' must be a boolean".format(param_name))
-                elif param_type == 'array':
-                    if not isinstance(param_value, list):
-                        raise BiDiValidationError("Parameter '{}' must be an array".format(param_name))
-                elif param_type == 'object':
-                    if not isinstance(param_value, dict):
-                        raise BiDiValidationError("Parameter '{}' must be an object".format(param_name))
-                elif param_type == 'enum':
-                    valid_values = param_schema.get('values', [])
-                    if param_value not in valid_values:
-                        raise BiDiValidationError("Parameter '{}' must be one of: {}".format(param_name, valid_values))
-            
-            # Validate custom validators
-            if 'validator' in param_schema:
-                validator = param_schema['validator']
-                if callable(validator):
-                    param_value = validator(param_value)
-            
-            validated_params[param_name] = param_value
-        
-        return validated_params
-
-    @staticmethod
-    def validate_response(method_name: str, response: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Validate WebDriver-BiDi response against a schema.
-        
-        Args:
-            method_name: Name of the WebDriver-BiDi method
-            response: Response to validate
-            schema: Validation schema
-            
-        Returns:
-            Validated response
-            
-        Raises:
-            BiDiValidationError: If validation fails
-        """
-        if not isinstance(response, dict):
-            raise BiDiValidationError("{} response must be a dictionary".format(method_name))
+    Args:
+        method_name: Name of the WebDriver-BiDi method
+        params: Parameters to validate
+        schema: Validation schema
         
-        # Check response type
-        if 'type' not in response:
-            raise BiDiValidationError("{} response missing 'type' field".format(method_name))
+    Returns:
+        Validated parameters
         
-        if response['type'] not in ['success', 'error', 'exception']:
-            raise BiDiValidationError("Invalid response type: {}".format(response['type']))
+    Raises:
+        BiDiValidationError: If validation fails
+    """
+    compiled = _COMPILED_PARAM_VALIDATORS.get(id(schema))
+    if compiled is not None and compiled[0] is schema:
+        return compiled[1](method_name, params)
+    # Ad-hoc schema that was not registered at import time
+    return _interpret_param_schema(method_name, params, schema)
+
+
+def validate_response(method_name: str, response: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate WebDriver-BiDi response against a schema.
+    
+    Args:
+        method_name: Name of the WebDriver-BiDi method
+        response: Response to validate
+        schema: Validation schema
         
-        # Validate success response
-        if response['type'] == 'success':
-            if 'result' not in response:
-                raise BiDiValidationError("{} success response missing 'result' field".format(method_name))
-            
-            # Validate result structure
-            result_schema = schema.get('result', {})
-            if result_schema:
-                BiDiTypeValidator.validate_method_parameters(method_name, response['result'], result_schema)
+    Returns:
+        Validated response
         
-        # Validate error response
-        elif response['type'] == 'error':
-            if 'error' not in response:
-                raise BiDiValidationError("{} error response missing 'error' field".format(method_name))
+    Raises:
+        BiDiValidationError: If validation fails
+    """
+    if not isinstance(response, dict):
+        raise BiDiValidationError("{} response must be a dictionary".format(method_name))
+    
+    # Check response type
+    response_type = response.get('type', _MISSING)
+    if response_type is _MISSING:
+        raise BiDiValidationError("{} response missing 'type' field".format(method_name))
+    
+    if response_type not in _RESPONSE_TYPES:
+        raise BiDiValidationError("Invalid response type: {}".format(response_type))
+    
+    # Validate success response
+    if response_type == 'success':
+        if 'result' not in response:
+            raise BiDiValidationError("{} success response missing 'result' field".format(method_name))
         
-        return response
+        # Validate result structure
+        result_schema = schema.get('result', {})
+        if result_schema:
+            validate_method_parameters(method_name, response['result'], result_schema)
+    
+    # Validate error response
+    elif response_type == 'error':
+        if 'error' not in response:
+            raise BiDiValidationError("{} error response missing 'error' field".format(method_name))
+    
+    return response
+
+
+class BiDiTypeValidator:
+    """
+    WebDriver-BiDi type validator utility class.
+
+    Kept as a namespace for backwards compatibility; the validators are
+    plain module-level functions.
+    """
+    
+    validate_method_parameters = staticmethod(validate_method_parameters)
+    validate_response = staticmethod(validate_response)
 
 
 # WebDriver-BiDi Method Schemas based on W3C specification
@@ -607,6 +903,39 @@ METHOD_SCHEMAS = {
 }
 
 
+def _freeze_schema(schema: Any) -> Any:
+    """
+    Recursively convert a schema into read-only mappings and tuples.
+
+    Args:
+        schema: Schema dict (or a nested value of one)
+
+    Returns:
+        The schema with dicts wrapped in MappingProxyType and lists as tuples
+    """
+    if isinstance(schema, dict):
+        return MappingProxyType({key: _freeze_schema(value) for key, value in schema.items()})
+    if isinstance(schema, list):
+        return tuple(_freeze_schema(value) for value in schema)
+    return schema
+
+
+# Schemas are shared by every caller; freeze them so a caller can't mutate
+# one out from under the compiled validators registered below. The top-level
+# dict is kept privately so lookups can use its bound get, which skips the
+# MappingProxyType forwarding layer.
+_METHOD_SCHEMA_TABLE = {name: _freeze_schema(schema) for name, schema in METHOD_SCHEMAS.items()}
+METHOD_SCHEMAS = MappingProxyType(_METHOD_SCHEMA_TABLE)
+_get_method_schema = _METHOD_SCHEMA_TABLE.get
+
+for _method_schema in METHOD_SCHEMAS.values():
+    if 'parameters' in _method_schema:
+        _register_param_validator(_method_schema['parameters'])
+    if 'result' in _method_schema.get('response', {}):
+        _register_param_validator(_method_schema['response']['result'])
+del _method_schema
+
+
 def get_method_schema(method_name: str) -> Optional[Dict[str, Any]]:
     """
     Get validation schema for a WebDriver-BiDi method.
@@ -617,7 +946,7 @@ def get_method_schema(method_name: str) -> Optional[Dict[str, Any]]:
     Returns:
         Validation schema or None if not found
     """
-    return METHOD_SCHEMAS.get(method_name)
+    return _get_method_schema(method_name)
 
 
 def validate_log_level(level: str) -> str:
@@ -634,10 +963,14 @@ def validate_log_level(level: str) -> str:
         BiDiTypeError: If the log level is invalid
     """
     try:
-        return LogLevel(level).value
-    except ValueError:
-        valid_levels = [l.value for l in LogLevel]
-        raise BiDiTypeError("Invalid log level '{}'. Valid levels: {}".format(level, valid_levels))
+        if level in _LOG_LEVEL_VALUES:
+            return level
+    except TypeError:
+        pass
+    value = _enum_value(LogLevel, level)
+    if value is not _MISSING:
+        return value
+    raise BiDiTypeError("Invalid log level '{}'. Valid levels: {}".format(level, _LOG_LEVEL_VALID))
 
 
 def validate_log_source(source: str) -> str:
@@ -654,10 +987,14 @@ def validate_log_source(source: str) -> str:
         BiDiTypeError: If the log source is invalid
     """
     try:
-        return LogSource(source).value
-    except ValueError:
-        valid_sources = [s.value for s in LogSource]
-        raise BiDiTypeError("Invalid log source '{}'. Valid sources: {}".format(source, valid_sources))
+        if source in _LOG_SOURCE_VALUES:
+            return source
+    except TypeError:
+        pass
+    value = _enum_value(LogSource, source)
+    if value is not _MISSING:
+        return value
+    raise BiDiTypeError("Invalid log source '{}'. Valid sources: {}".format(source, _LOG_SOURCE_VALID))
 
 
 class ConsoleLogEntry:
@@ -677,6 +1014,9 @@ class ConsoleLogEntry:
         method: The console method called (log, warn, error, etc.)
     """
 
+    # One instance is created per log.entryAdded event, so skip the per-instance __dict__
+    __slots__ = ('level', 'source', 'text', 'timestamp', 'context_id', 'stack_trace', 'args', 'method')
+
     def __init__(self,
                  level: str,
                  source: str,
@@ -719,29 +1059,28 @@ class ConsoleLogEntry:
         Returns:
             ConsoleLogEntry instance
         """
-        params = event.get('params', {})
-
-        # Extract required fields
-        level = params.get('level', 'info')
-        source = params.get('source', {}).get('type', 'console') if isinstance(params.get('source'), dict) else params.get('source', 'console')
-        text = params.get('text', '')
-        timestamp = params.get('timestamp', 0)
-
-        # Extract optional fields
-        context_id = params.get('source', {}).get('context') if isinstance(params.get('source'), dict) else None
-        stack_trace = params.get('stackTrace')
-        args = params.get('args', [])
-        method = params.get('method')
+        params = event.get('params') or {}
+
+        # The source is normally a script.Source dict carrying both the
+        # source type and the browsing context; read it once.
+        source = params.get('source')
+        if isinstance(source, dict):
+            context_id = source.get('context')
+            source = source.get('type', 'console')
+        else:
+            context_id = None
+            if source is None:
+                source = 'console'
 
         return cls(
-            level=level,
-            source=source,
-            text=text,
-            timestamp=timestamp,
-            context_id=context_id,
-            stack_trace=stack_trace,
-            args=args,
-            method=method
+            params.get('level', 'info'),
+            source,
+            params.get('text', ''),
+            params.get('timestamp', 0),
+            context_id,
+            params.get('stackTrace'),
+            params.get('args'),
+            params.get('method')
         )
 
     def to_dict(self) -> Dict[str, Any]:
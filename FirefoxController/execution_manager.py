@@ -11,19 +11,24 @@ import logging
 import subprocess
 import time
 import uuid
-import websocket
 import tempfile
 import os
 import os.path
 import shutil
 import base64
+import collections
 import queue
 import threading
+import urllib.error
 import urllib.request
+import email.utils
+import itertools
 import signal
+import socket
 import sys
 import re
-from typing import Optional, Dict, Any, List, Union
+import select
+from typing import Optional, Dict, Any, List, Union, Callable
 from urllib.parse import urlparse
 
 IS_WINDOWS = sys.platform == 'win32'
@@ -36,6 +41,80 @@ except ImportError:
     WEBSOCKETS_AVAILABLE = False
     connect = None
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+def _encode_message(message: Dict[str, Any]) -> str:
+    """
+    Serialize a WebDriver BiDi message to a JSON text frame.
+
+    Uses orjson when it is installed. orjson is stricter than the json module
+    (e.g. integers wider than 64 bits), so anything it rejects falls back to json.
+
+    Args:
+        message: Message to serialize
+
+    Returns:
+        JSON string
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(message)
+
+
+def _decode_message(data: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Parse a WebDriver BiDi frame received from the WebSocket.
+
+    Uses orjson when it is installed, falling back to json for input orjson
+    refuses (e.g. NaN/Infinity literals, which json accepts).
+
+    Args:
+        data: Raw frame contents
+
+    Returns:
+        Parsed message
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+
+def _message_template(method: str, params: Dict[str, Any]) -> str:
+    """
+    Pre-encode a fixed WebDriver BiDi command.
+
+    The returned string is the encoded message with a %d placeholder for the
+    message ID, so _send_message only has to format the ID in at send time.
+
+    Args:
+        method: Command name
+        params: Command parameters (must not change between sends)
+
+    Returns:
+        Encoded message template
+    """
+    body = _encode_message({"method": method, "params": params})
+    return '{"id":%d,' + body[1:].replace('%', '%%')
+
+
+# Commands that are sent repeatedly with the same parameters
+_SUBSCRIBE_DOM_CONTENT_LOADED = _message_template(
+    'session.subscribe', {'events': ['browsingContext.domContentLoaded']})
+_CREATE_TAB = _message_template('browsingContext.create', {'type': 'tab'})
+_GET_TOP_LEVEL_TREE = _message_template('browsingContext.getTree', {'maxDepth': 0})
+
 from .exceptions import (
     FirefoxStartupException,
     FirefoxConnectFailure,
@@ -48,6 +127,279 @@ from .exceptions import (
 )
 
 
+# Free space a RAM-backed filesystem needs before temporary profiles go there.
+# Container /dev/shm mounts are often only 64MB, too small for Firefox's caches.
+_TMPFS_MIN_FREE_BYTES = 512 * 1024 * 1024
+
+
+def _temp_profile_root() -> Optional[str]:
+    """
+    Pick the parent directory for temporary profiles.
+
+    Prefers RAM-backed storage (/dev/shm, then $XDG_RUNTIME_DIR) so that
+    Firefox's profile writes don't hit the disk, as long as it has room.
+
+    Returns:
+        Directory path, or None for the tempfile module's default
+    """
+    candidates = []
+    if IS_LINUX:
+        candidates.append('/dev/shm')
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        candidates.append(runtime_dir)
+
+    for candidate in candidates:
+        try:
+            if not os.path.isdir(candidate) or not os.access(candidate, os.W_OK):
+                continue
+            stats = os.statvfs(candidate)
+        except (OSError, AttributeError):
+            continue
+        if stats.f_bavail * stats.f_frsize >= _TMPFS_MIN_FREE_BYTES:
+            return candidate
+
+    return None
+
+
+# Sentinel for lookups where None is a meaningful value
+_MISSING = object()
+
+
+def _compile_pattern(pattern: dict) -> tuple:
+    """
+    Flatten an event-matching pattern into (key path, normalized value) leaves.
+
+    Values are compared as strings with slashes removed (see _pattern_matches),
+    so the pattern side is normalized once here rather than on every event.
+    An empty nested dict becomes a presence-only leaf with value None.
+
+    Args:
+        pattern: Possibly nested dict of expected values
+
+    Returns:
+        Tuple of (path tuple, normalized string or None) pairs
+    """
+    leaves = []
+    stack = [((), pattern)]
+    while stack:
+        path, node = stack.pop()
+        if path and not node:
+            leaves.append((path, None))
+            continue
+        for key, value in node.items():
+            key_path = path + (key,)
+            if isinstance(value, dict):
+                stack.append((key_path, value))
+            else:
+                leaves.append((key_path, str(value).replace('/', '')))
+    return tuple(leaves)
+
+
+def _pattern_matches(compiled: tuple, data: dict, required: bool) -> bool:
+    """
+    Check data against a pattern compiled by _compile_pattern.
+
+    Args:
+        compiled: Compiled pattern leaves
+        data: Event params to check
+        required: If True, every pattern key must be present in data;
+            otherwise keys missing from data are ignored
+
+    Returns:
+        True if every present (or required) leaf matches, up to slashes
+    """
+    for path, expected in compiled:
+        node = data
+        for key in path:
+            if not isinstance(node, dict):
+                node = _MISSING
+                break
+            node = node.get(key, _MISSING)
+            if node is _MISSING:
+                break
+        if node is _MISSING:
+            if required:
+                return False
+            continue
+        if expected is not None and str(node).replace('/', '') != expected:
+            return False
+    return True
+
+
+class _EventWaiter:
+    """A thread waiting in _receive_event for an event matching a pattern."""
+
+    __slots__ = ('event_type', 'pattern', 'result')
+
+    def __init__(self, event_type: str, pattern: tuple):
+        self.event_type = event_type
+        self.pattern = pattern
+        self.result = None
+
+
+class _EventQueue:
+    """
+    Per-tab event queue holding at most maxlen events.
+
+    Offers the SimpleQueue methods the interfaces use. When a tab's events
+    aren't being consumed the oldest ones are dropped, so the queue can't
+    grow without bound.
+    """
+
+    def __init__(self, maxlen: int):
+        self._items = collections.deque(maxlen=maxlen)
+        self._not_empty = threading.Condition(threading.Lock())
+        self.dropped = 0  # Events discarded because the queue was full
+
+    def put(self, item) -> bool:
+        """
+        Add an event, dropping the oldest one if the queue is full.
+
+        Returns:
+            True if an older event was dropped to make room
+        """
+        with self._not_empty:
+            full = len(self._items) == self._items.maxlen
+            if full:
+                self.dropped += 1
+            self._items.append(item)
+            self._not_empty.notify()
+        return full
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        """
+        Remove and return the oldest event.
+
+        Raises:
+            queue.Empty: If no event is available (within timeout, when blocking)
+        """
+        with self._not_empty:
+            if block:
+                self._not_empty.wait_for(lambda: self._items, timeout)
+            if not self._items:
+                raise queue.Empty
+            return self._items.popleft()
+
+    def get_nowait(self):
+        """Remove and return the oldest event without blocking."""
+        return self.get(False)
+
+    def empty(self) -> bool:
+        """Return True if the queue holds no events."""
+        return not self._items
+
+    def qsize(self) -> int:
+        """Return the number of queued events."""
+        return len(self._items)
+
+
+def _user_cache_dir() -> str:
+    """
+    Get the per-user cache directory for downloaded files (e.g. extensions).
+
+    Returns:
+        %LOCALAPPDATA%\\FirefoxController on Windows, otherwise
+        $XDG_CACHE_HOME/firefox_controller (default ~/.cache/firefox_controller)
+    """
+    if IS_WINDOWS:
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        return os.path.join(base, 'FirefoxController')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'firefox_controller')
+
+
+def _link_or_copy(src: str, dst: str):
+    """
+    Make dst a hard link to src, copying the bytes if linking isn't possible.
+
+    The cache is only ever updated by renaming a new file over it, so a linked
+    copy in a profile keeps the old contents instead of changing underneath it.
+
+    Args:
+        src: Existing file
+        dst: Path to create
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Different filesystem, no hard link support, or not permitted
+        shutil.copyfile(src, dst)
+
+
+def _remove_tree_in_background(path: str) -> threading.Thread:
+    """
+    Delete a directory tree without waiting for it.
+
+    The directory is first renamed aside, so path is gone as soon as this
+    returns, then deleted by a worker thread. The thread is not a daemon, so
+    interpreter exit waits for the deletion to finish.
+
+    Args:
+        path: Directory to delete
+
+    Returns:
+        The thread doing the deletion
+    """
+    doomed = "{}.deleting-{}".format(path, uuid.uuid4().hex)
+    try:
+        os.rename(path, doomed)
+    except OSError:
+        # E.g. a file in it is still open on Windows; delete what we can in place
+        doomed = path
+
+    thread = threading.Thread(target=shutil.rmtree, args=(doomed,), kwargs={'ignore_errors': True},
+                              name="FirefoxController profile cleanup")
+    thread.start()
+    return thread
+
+
+# Initial prefs.js for new profiles; {} is the remote debugging port.
+# These are the critical settings that Firefox requires for remote debugging.
+_PREFS_JS_TEMPLATE = """user_pref("devtools.debugger.remote-enabled", true);
+user_pref("devtools.chrome.enabled", true);
+user_pref("devtools.debugger.prompt-connection", false);
+user_pref("devtools.debugger.forbid-certified-apps", false);
+user_pref("devtools.remote.adb.extensionURL", "");
+user_pref("devtools.remote.wifi.enabled", true);
+user_pref("devtools.remote.usb.enabled", true);
+
+user_pref("devtools.remote.force-local", true);
+user_pref("devtools.debugger.force-local", true);
+user_pref("devtools.debugger.chrome-enabled", true);
+user_pref("devtools.debugger.remote-mode", true);
+user_pref("devtools.debugger.remote-port", {});
+user_pref("devtools.debugger.remote-host", "localhost");
+
+// Auto-enable extensions without user interaction
+user_pref("extensions.autoDisableScopes", 0);
+user_pref("extensions.enabledScopes", 15);
+// Don't show first-run pages for extensions
+user_pref("extensions.getAddons.showPane", false);
+user_pref("extensions.update.enabled", false);
+
+// Prevent clearing cookies and other data on shutdown
+user_pref("privacy.sanitize.sanitizeOnShutdown", false);
+user_pref("privacy.clearOnShutdown.cookies", false);
+user_pref("privacy.clearOnShutdown.cache", false);
+user_pref("privacy.clearOnShutdown.offlineApps", false);
+user_pref("privacy.clearOnShutdown.sessions", false);
+user_pref("privacy.clearOnShutdown.formdata", false);
+user_pref("privacy.clearOnShutdown.history", false);
+// Version 2 preferences for newer Firefox versions
+user_pref("privacy.clearOnShutdown_v2.cookiesAndStorage", false);
+user_pref("privacy.clearOnShutdown_v2.cache", false);
+user_pref("privacy.clearOnShutdown_v2.formdata", false);
+user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
+"""
+
+# Matches boolean user_pref() lines in prefs.js, capturing name and value.
+_BOOL_PREF_RE = re.compile(r'user_pref\("([^"]+)",\s*(true|false)\);')
+
+# "firefox --version" output, e.g. "Mozilla Firefox 148.0" or "Mozilla Firefox 140.7.1esr"
+_FIREFOX_VERSION_RE = re.compile(r'Mozilla Firefox (\d+)\.')
+
+
 class FirefoxExecutionManager:
     """
     Class for managing Firefox execution and remote debugging connection.
@@ -63,7 +415,8 @@ class FirefoxExecutionManager:
                  websocket_timeout: int = 10,
                  headless: bool = False,
                  additional_options: List[str] = None,
-                 profile_dir: str = None):
+                 profile_dir: str = None,
+                 temporary_profile: bool = False):
         """
         Initialize Firefox execution manager.
 
@@ -74,7 +427,11 @@ class FirefoxExecutionManager:
             websocket_timeout: WebSocket timeout in seconds
             headless: Run Firefox in headless mode
             additional_options: Additional command line options for Firefox
-            profile_dir: Custom profile directory (None for temporary profile)
+            profile_dir: Custom profile directory (None for the persistent
+                ~/.firefox_controller_profile, unless temporary_profile is set)
+            temporary_profile: Use a throwaway profile that is deleted on close(),
+                placed in RAM-backed storage where available. Ignored if
+                profile_dir is given.
         """
         self.binary = binary
         self.host = host
@@ -95,17 +452,28 @@ class FirefoxExecutionManager:
         self.ws = None
         self.ws_connection = None
         self.root_actor = None
-        self.log = logging.getLogger("FirefoxController.ExecutionManager")
 
-        if self.profile_dir is None:
+        # A temporary profile is created by _create_profile() when Firefox starts
+        self.temporary_profile = temporary_profile and profile_dir is None
+        if self.profile_dir is None and not self.temporary_profile:
             self.profile_dir = os.path.expanduser("~/.firefox_controller_profile")
         
-        # Message ID counter
-        self.msg_id = 0
+        # Firefox binary, resolved and version-checked by the first start_firefox()
+        self._firefox_path = None
+
+        # Last lines Firefox wrote to stderr, kept by a drain thread so the pipe
+        # never fills up and blocks Firefox
+        self._stderr_tail = collections.deque(maxlen=self.STDERR_TAIL_LINES)
+        self._stderr_thread = None
+
+        # Message ID allocator; next() on a count is atomic under the GIL
+        self._msg_ids = itertools.count(1)
         
         # Track active tabs - each tab will have its own interface
         self.tabs = {}  # context_id -> FirefoxRemoteDebugInterface
         self.tab_id_map = {}  # context_id -> tab_info
+        self._url_to_tabs = {}  # url -> set of context_ids, kept in step with tab_id_map
+        self._listed_contexts = None  # getTree contexts tabs was last built from (None if changed since)
         
         # Track browsing context for the default tab
         self.browsing_context = None
@@ -116,11 +484,19 @@ class FirefoxExecutionManager:
         self.temp_profile = None
 
         # Per-tab event queues for handling asynchronous events
-        self.event_queues = {}  # context_id -> queue.Queue()
+        self.event_queues = {}  # context_id -> _EventQueue
         self.event_queues_lock = threading.Lock()
 
         # Thread safety for ExecutionManager (shared across tabs)
-        self.ws_lock = threading.Lock()  # Protects WebSocket send/recv
+        self.ws_lock = threading.Lock()  # Held by whichever thread is reading the WebSocket
+        self.ws_send_lock = threading.Lock()  # Serializes WebSocket sends
+
+        # Commands awaiting a response, keyed by message ID. The thread that
+        # holds ws_lock reads frames for everyone and files responses here;
+        # other waiters block on the condition until theirs arrives.
+        self._pending_responses = {}  # msg_id -> response dict (None until received)
+        self._event_waiters = {}  # event method -> _EventWaiter instances registered by _receive_event
+        self._pending_cond = threading.Condition()
 
         # Track global network event subscription (shared across all tabs)
         self.network_events_subscribed = False
@@ -149,13 +525,17 @@ class FirefoxExecutionManager:
         self._console_interfaces_lock = threading.Lock()
 
         # Per-tab console event queues for log.entryAdded events
-        self.console_queues = {}  # context_id -> queue.Queue()
+        self.console_queues = {}  # context_id -> _EventQueue
         self.console_queues_lock = threading.Lock()
         
     def _install_ublock_origin(self, profile_path: str):
         """
         Download and install uBlock Origin extension into the profile.
 
+        The XPI is kept in a per-user cache and revalidated with a conditional
+        request (ETag / If-Modified-Since), so new profiles normally only cost
+        a 304 round trip and a local copy.
+
         Args:
             profile_path: Path to the Firefox profile directory
         """
@@ -177,27 +557,101 @@ class FirefoxExecutionManager:
             self.log.debug("uBlock Origin already installed at {}".format(extension_path))
             return
 
+        cache_path = os.path.join(_user_cache_dir(), "{}.xpi".format(extension_id))
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        except OSError as e:
+            self.log.debug("Extension cache unavailable ({}), downloading into the profile".format(e))
+            cache_path = None
+
         # Download the extension
         self.log.info("Downloading uBlock Origin extension...")
         try:
-            # Create a request with a proper User-Agent to avoid 403 errors
-            request = urllib.request.Request(
-                ublock_url,
-                headers={'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0'}
-            )
-            with urllib.request.urlopen(request, timeout=30) as response:
-                xpi_data = response.read()
-
-            # Write the XPI file
-            with open(extension_path, 'wb') as f:
-                f.write(xpi_data)
+            if cache_path:
+                if not self._download_if_modified(ublock_url, cache_path, cache_path + ".etag"):
+                    self.log.debug("Cached uBlock Origin is up to date")
+                _link_or_copy(cache_path, extension_path)
+            else:
+                self._download_if_modified(ublock_url, extension_path)
 
             self.log.info("uBlock Origin installed to {}".format(extension_path))
 
         except Exception as e:
-            self.log.warning("Failed to download uBlock Origin: {}".format(e))
+            if cache_path and os.path.exists(cache_path):
+                self.log.warning("Failed to update uBlock Origin ({}), using cached copy".format(e))
+                try:
+                    _link_or_copy(cache_path, extension_path)
+                except OSError as copy_error:
+                    self.log.warning("Failed to install cached uBlock Origin: {}".format(copy_error))
+            else:
+                self.log.warning("Failed to download uBlock Origin: {}".format(e))
             # Don't raise - extension is optional, continue without it
 
+    # Read size used when streaming downloads to disk
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+    def _download_if_modified(self, url: str, target_path: str, etag_path: Optional[str] = None) -> bool:
+        """
+        Download url to target_path unless the existing file is still current.
+
+        Args:
+            url: URL to fetch
+            target_path: Destination file; if it exists, a conditional request is made
+            etag_path: Sidecar file for the ETag of target_path (None to not track it)
+
+        Returns:
+            True if a new copy was downloaded, False if the server reported 304
+
+        Raises:
+            urllib.error.URLError, OSError: If the download fails
+        """
+        # Create a request with a proper User-Agent to avoid 403 errors
+        headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0'}
+        if os.path.exists(target_path):
+            headers['If-Modified-Since'] = email.utils.formatdate(os.path.getmtime(target_path), usegmt=True)
+            if etag_path:
+                try:
+                    with open(etag_path, 'r') as f:
+                        etag = f.read().strip()
+                    if etag:
+                        headers['If-None-Match'] = etag
+                except OSError:
+                    pass
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=30)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return False
+            raise
+
+        with response:
+            etag = response.headers.get('ETag')
+
+            # Stream to a temporary file and rename, so concurrent or interrupted
+            # downloads never leave a truncated file behind
+            fd, partial_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix=".part")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    shutil.copyfileobj(response, f, self.DOWNLOAD_CHUNK_SIZE)
+                os.replace(partial_path, target_path)
+            except BaseException:
+                try:
+                    os.remove(partial_path)
+                except OSError:
+                    pass
+                raise
+
+        if etag_path:
+            if etag:
+                with open(etag_path, 'w') as f:
+                    f.write(etag)
+            elif os.path.exists(etag_path):
+                os.remove(etag_path)
+
+        return True
+
     def _create_user_js(self, profile_path: str):
         """
         Create user.js file with cookie persistence preferences.
@@ -303,26 +757,28 @@ user_pref("browser.cache.memory.enable", true);  // Enable memory cache
             with open(prefs_file, 'r') as f:
                 content = f.read()
 
-            # Check which prefs need to be added/fixed
-            prefs_to_add = []
-            for pref_name, pref_value in required_prefs.items():
-                # Use regex to check if preference exists and what its value is
-                pattern = r'user_pref\("{0}",\s*(true|false)\);'.format(re.escape(pref_name))
-                match = re.search(pattern, content)
-
-                if not match or match.group(1) != pref_value:
-                    prefs_to_add.append('user_pref("{0}", {1});'.format(pref_name, pref_value))
+            # Check which prefs need to be added/fixed, scanning the file once.
+            # Later lines win, as they do when Firefox loads prefs.js.
+            existing = dict(_BOOL_PREF_RE.findall(content))
+            prefs_to_add = [
+                'user_pref("{0}", {1});\n'.format(pref_name, pref_value)
+                for pref_name, pref_value in required_prefs.items()
+                if existing.get(pref_name) != pref_value
+            ]
 
             # Append missing/incorrect preferences
             if prefs_to_add:
                 with open(prefs_file, 'a') as f:
-                    f.write('\n// Cookie persistence settings (added by FirefoxController)\n')
-                    for pref_line in prefs_to_add:
-                        f.write(pref_line + '\n')
+                    f.write('\n// Cookie persistence settings (added by FirefoxController)\n' + ''.join(prefs_to_add))
                 self.log.info("Updated {} privacy preferences to preserve cookies".format(len(prefs_to_add)))
 
     def _create_profile(self) -> str:
         """Create a temporary Firefox profile with required preferences"""
+        if self.temporary_profile and self.temp_profile is None:
+            self.temp_profile = tempfile.mkdtemp(prefix="firefox_controller_", dir=_temp_profile_root())
+            self.profile_dir = self.temp_profile
+            self.log.debug("Created temporary profile: {}".format(self.temp_profile))
+
         # Use provided profile directory
         profile_path = self.profile_dir
         if not os.path.exists(profile_path):
@@ -331,50 +787,14 @@ user_pref("browser.cache.memory.enable", true);  // Enable memory cache
         # Install uBlock Origin extension
         self._install_ublock_origin(profile_path)
 
-        # Create prefs.js only if it doesn't exist (allows user customization)
+        # Create prefs.js only if it doesn't exist (allows user customization).
+        # Exclusive creation checks for and creates the file in one step.
         prefs_file = os.path.join(profile_path, "prefs.js")
-        if not os.path.exists(prefs_file):
-            # These are the critical settings that Firefox requires for remote debugging
-            prefs_content = """user_pref("devtools.debugger.remote-enabled", true);
-user_pref("devtools.chrome.enabled", true);
-user_pref("devtools.debugger.prompt-connection", false);
-user_pref("devtools.debugger.forbid-certified-apps", false);
-user_pref("devtools.remote.adb.extensionURL", "");
-user_pref("devtools.remote.wifi.enabled", true);
-user_pref("devtools.remote.usb.enabled", true);
-
-user_pref("devtools.remote.force-local", true);
-user_pref("devtools.debugger.force-local", true);
-user_pref("devtools.debugger.chrome-enabled", true);
-user_pref("devtools.debugger.remote-mode", true);
-user_pref("devtools.debugger.remote-port", {});
-user_pref("devtools.debugger.remote-host", "localhost");
-
-// Auto-enable extensions without user interaction
-user_pref("extensions.autoDisableScopes", 0);
-user_pref("extensions.enabledScopes", 15);
-// Don't show first-run pages for extensions
-user_pref("extensions.getAddons.showPane", false);
-user_pref("extensions.update.enabled", false);
-
-// Prevent clearing cookies and other data on shutdown
-user_pref("privacy.sanitize.sanitizeOnShutdown", false);
-user_pref("privacy.clearOnShutdown.cookies", false);
-user_pref("privacy.clearOnShutdown.cache", false);
-user_pref("privacy.clearOnShutdown.offlineApps", false);
-user_pref("privacy.clearOnShutdown.sessions", false);
-user_pref("privacy.clearOnShutdown.formdata", false);
-user_pref("privacy.clearOnShutdown.history", false);
-// Version 2 preferences for newer Firefox versions
-user_pref("privacy.clearOnShutdown_v2.cookiesAndStorage", false);
-user_pref("privacy.clearOnShutdown_v2.cache", false);
-user_pref("privacy.clearOnShutdown_v2.formdata", false);
-user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
-""".format(self.port)
-            with open(prefs_file, "w") as f:
-                f.write(prefs_content)
+        try:
+            with open(prefs_file, "x") as f:
+                f.write(_PREFS_JS_TEMPLATE.format(self.port))
             self.log.info("Created new prefs.js in profile")
-        else:
+        except FileExistsError:
             self.log.debug("Using existing prefs.js (user customizations preserved)")
 
         # Create user.js for cookie persistence (overrides prefs.js and isn't modified by Firefox)
@@ -421,6 +841,40 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
     # Minimum Firefox version (network.addDataCollector added in 143)
     MINIMUM_FIREFOX_VERSION = 143
 
+    # Detected versions shared by all managers, keyed by binary identity:
+    # (real path, mtime, size) -> major version
+    _version_cache = {}
+    _version_cache_lock = threading.Lock()
+
+    def _cached_firefox_version(self, firefox_path: str) -> Optional[int]:
+        """
+        Get the major version of the Firefox binary, running "--version" only
+        once per binary for all managers in the process.
+
+        The cache key includes the file's mtime and size, so an upgraded
+        binary is detected again.
+
+        Args:
+            firefox_path: Path to the Firefox binary
+
+        Returns:
+            Major version as int, or None if version could not be determined
+        """
+        try:
+            stat = os.stat(firefox_path)
+        except OSError:
+            return self._get_firefox_version(firefox_path)
+        key = (os.path.realpath(firefox_path), stat.st_mtime_ns, stat.st_size)
+
+        with self._version_cache_lock:
+            version = self._version_cache.get(key)
+        if version is None:
+            version = self._get_firefox_version(firefox_path)
+            if version is not None:
+                with self._version_cache_lock:
+                    self._version_cache[key] = version
+        return version
+
     def _get_firefox_version(self, firefox_path: str) -> Optional[int]:
         """
         Get the major version number of the Firefox binary.
@@ -436,8 +890,7 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
                 [firefox_path, "--version"],
                 capture_output=True, text=True, timeout=10
             )
-            # Output format: "Mozilla Firefox 148.0" or "Mozilla Firefox 140.7.1esr"
-            match = re.search(r'Mozilla Firefox (\d+)\.', result.stdout)
+            match = _FIREFOX_VERSION_RE.search(result.stdout)
             if match:
                 return int(match.group(1))
         except Exception as e:
@@ -446,18 +899,24 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
 
     def start_firefox(self):
         """Start Firefox with remote debugging enabled"""
-        firefox_path = self._find_firefox_binary()
-
-        # Check Firefox version
-        version = self._get_firefox_version(firefox_path)
-        if version is not None:
-            self.log.info("Detected Firefox version: {}".format(version))
-            if version < self.MINIMUM_FIREFOX_VERSION:
-                raise FirefoxStartupException(
-                    "Firefox {} is too old. Minimum supported version is {}. "
-                    "Please update Firefox.".format(version, self.MINIMUM_FIREFOX_VERSION))
-        else:
-            self.log.warning("Could not determine Firefox version. Proceeding anyway.")
+        firefox_path = self._firefox_path
+        if firefox_path is None:
+            firefox_path = self._find_firefox_binary()
+
+            # Check Firefox version
+            version = self._cached_firefox_version(firefox_path)
+            if version is not None:
+                self.log.info("Detected Firefox version: {}".format(version))
+                if version < self.MINIMUM_FIREFOX_VERSION:
+                    raise FirefoxStartupException(
+                        "Firefox {} is too old. Minimum supported version is {}. "
+                        "Please update Firefox.".format(version, self.MINIMUM_FIREFOX_VERSION))
+            else:
+                self.log.warning("Could not determine Firefox version. Proceeding anyway.")
+
+            # Restarts reuse the checked binary instead of searching PATH and
+            # running "firefox --version" again
+            self._firefox_path = firefox_path
 
         # Create profile if needed
         profile_path = self._create_profile()
@@ -487,7 +946,7 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
 
         try:
             popen_kwargs = {
-                'stdout': subprocess.PIPE,
+                'stdout': subprocess.DEVNULL,
                 'stderr': subprocess.PIPE,
             }
 
@@ -502,15 +961,31 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
 
             self.process = subprocess.Popen(cmd, **popen_kwargs)
 
+            # Nothing else reads stderr, so drain it continuously; otherwise a
+            # chatty Firefox stalls once the pipe buffer (64KB on Linux) is full
+            self._stderr_tail = collections.deque(maxlen=self.STDERR_TAIL_LINES)
+            self._stderr_thread = None
+            if self.process.stderr is not None:
+                self._stderr_thread = threading.Thread(
+                    target=self._drain_stderr,
+                    args=(self.process.stderr, self._stderr_tail),
+                    name="firefox-stderr",
+                    daemon=True
+                )
+                self._stderr_thread.start()
+
             if IS_WINDOWS:
                 self._assign_to_job_object()
 
-            # Give Firefox more time to start
-            time.sleep(4)
+            # Wait for the Remote Agent to start listening instead of a fixed delay.
+            # connect() still retries if the port is up before BiDi is ready.
+            if not self._wait_for_port(self.STARTUP_TIMEOUT) and self.process.poll() is None:
+                self.log.warning("Remote Agent not accepting connections after {}s, trying to connect anyway".format(
+                    self.STARTUP_TIMEOUT))
 
             # Check if process is still running
             if self.process.poll() is not None:
-                stderr = self.process.stderr.read().decode('utf-8') if self.process.stderr else ""
+                stderr = self._recent_stderr()
                 raise FirefoxStartupException("Firefox failed to start: {}".format(stderr))
 
         except FirefoxStartupException:
@@ -518,6 +993,80 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
         except Exception as e:
             raise FirefoxStartupException("Failed to start Firefox: {}".format(e))
     
+    # Maximum time start_firefox() waits for the Remote Agent port to open
+    STARTUP_TIMEOUT = 30
+
+    # Number of Firefox stderr lines kept for error messages
+    STDERR_TAIL_LINES = 512
+
+    @staticmethod
+    def _drain_stderr(stream, tail: collections.deque):
+        """
+        Read Firefox's stderr until it closes, keeping only the last lines.
+
+        Args:
+            stream: The process's stderr pipe
+            tail: Bounded deque receiving the lines
+        """
+        try:
+            for line in stream:
+                tail.append(line)
+        except Exception:
+            # Pipe closed underneath us, or not a readable stream at all;
+            # either way there is nothing more to collect
+            pass
+        finally:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def _recent_stderr(self) -> str:
+        """
+        Get the last lines Firefox wrote to stderr.
+
+        Meant for after the process has died: gives the drain thread a moment
+        to pick up the final output first.
+
+        Returns:
+            The captured stderr text (empty if nothing was written)
+        """
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(1.0)
+        return b"".join(self._stderr_tail).decode('utf-8', errors='replace')
+
+    def _wait_for_port(self, timeout: float) -> bool:
+        """
+        Wait until Firefox's Remote Agent accepts TCP connections on self.port.
+
+        Probes with exponential backoff (50ms doubling up to 250ms) and stops
+        early if the Firefox process exits.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            True if the port accepted a connection, False on timeout or process exit
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+
+        while True:
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.25):
+                    return True
+            except OSError:
+                pass
+
+            if self.process.poll() is not None:
+                return False
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.25)
+
     def _set_pdeathsig(self):
         """Set parent death signal to ensure Firefox dies when parent dies (Linux only).
 
@@ -657,7 +1206,7 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
         for attempt in range(max_retries):
             # Check that Firefox is still alive before each attempt
             if self.process.poll() is not None:
-                stderr = self.process.stderr.read().decode('utf-8') if self.process.stderr else ""
+                stderr = self._recent_stderr()
                 raise FirefoxConnectFailure("Firefox process died during connection. stderr: {}".format(stderr))
 
             try:
@@ -714,26 +1263,14 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
             self.log.info("Connected to WebDriver BiDi session: {}".format(session_id))
 
             # Subscribe to browser events
-            self._send_message({
-                'method': 'session.subscribe',
-                'params': {
-                    'events': [
-                        'browsingContext.domContentLoaded',
-                    ]
-                }
-            })
+            self._send_message(_SUBSCRIBE_DOM_CONTENT_LOADED)
 
             # Use default user context instead of creating a new one
             # This allows cookies to persist across browser restarts
             self.user_context = 'default'
 
             # Create browsing context and handle the event response
-            create_response = self._send_message({
-                'method': 'browsingContext.create',
-                'params': {
-                    'type': 'tab'
-                }
-            })
+            create_response = self._send_message(_CREATE_TAB)
 
             self.log.debug("browsingContext.create response: {}".format(create_response))
 
@@ -759,10 +1296,7 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
             # Format 4: fall back to getTree to discover existing contexts
             if not context_id:
                 self.log.debug("Still no context, querying browsingContext.getTree...")
-                tree_response = self._send_message({
-                    'method': 'browsingContext.getTree',
-                    'params': {'maxDepth': 0}
-                })
+                tree_response = self._send_message(_GET_TOP_LEVEL_TREE)
                 contexts = tree_response.get('result', {}).get('contexts', [])
                 if contexts:
                     context_id = contexts[0].get('context')
@@ -785,11 +1319,17 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
             self.log.warning("WebDriver BiDi initialization failed: {}".format(e))
             raise FirefoxCommunicationsError("Failed to initialize WebDriver BiDi connection: {}".format(e))
     
-    def _send_message(self, message: Dict[str, Any], timeout: Optional[int] = None) -> Dict[str, Any]:
+    def _send_message(self, message: Union[Dict[str, Any], str], timeout: Optional[int] = None) -> Dict[str, Any]:
         """Send a message to Firefox and wait for response (thread-safe)
 
+        Several threads may have commands in flight at once. Only the send
+        itself is serialized, and the waiting threads take turns reading the
+        WebSocket, handing each other's responses over through
+        _pending_responses.
+
         Args:
-            message: WebDriver BiDi message to send
+            message: WebDriver BiDi message to send, or a pre-encoded template
+                from _message_template()
             timeout: Timeout in seconds (defaults to websocket_timeout)
 
         Returns:
@@ -799,119 +1339,319 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
             FirefoxResponseNotReceived: If no response received within timeout
             FirefoxError: If Firefox returns an error response
         """
+        return self._send_messages([message], timeout)[0]
+
+    def _send_messages(self, messages: List[Union[Dict[str, Any], str]],
+                       timeout: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Send several messages back to back, then wait for all responses (thread-safe)
+
+        The commands are pipelined: all of them are written before waiting, so
+        the batch costs one round trip to Firefox instead of one per command.
+        Firefox still executes and answers each command separately.
+
+        Args:
+            messages: WebDriver BiDi messages to send, or pre-encoded templates
+                from _message_template()
+            timeout: Timeout in seconds for the whole batch (defaults to websocket_timeout)
+
+        Returns:
+            Response messages from Firefox, in the order of messages
+
+        Raises:
+            FirefoxResponseNotReceived: If a response is not received within timeout
+            FirefoxError: If Firefox returns an error response to any message
+        """
         if not self.ws_connection:
             raise FirefoxCommunicationsError("WebSocket not connected")
 
-        with self.ws_lock:  # Thread-safe WebSocket access
-            try:
+        timeout = timeout if timeout is not None else self.websocket_timeout
+        expected_ids = []
+
+        try:
+            message_strs = []
+            for message in messages:
                 # Always assign a new message ID to avoid collisions
-                self.msg_id += 1
-                message["id"] = self.msg_id
+                expected_id = next(self._msg_ids)
+                if isinstance(message, str):
+                    message_str = message % expected_id
+                else:
+                    message["id"] = expected_id
+                    message_str = _encode_message(message)
+                if self.log.isEnabledFor(logging.DEBUG):
+                    self.log.debug("Sending message: {}".format(message_str))
+                expected_ids.append(expected_id)
+                message_strs.append(message_str)
+
+            # Register before sending so whoever is reading can file the responses
+            with self._pending_cond:
+                for expected_id in expected_ids:
+                    self._pending_responses[expected_id] = None
+
+            with self.ws_send_lock:
+                for message_str in message_strs:
+                    self.ws_connection.send(message_str)
+
+            # Wait for the responses with matching IDs
+            deadline = time.monotonic() + timeout
+            responses = []
+            for expected_id in expected_ids:
+                response = self._wait_for_response(expected_id, timeout, deadline)
+
+                # Check for errors
+                if "error" in response:
+                    error_msg = response.get("message", "Unknown error")
+                    if isinstance(error_msg, dict):
+                        error_msg = str(error_msg)
+                    raise FirefoxError("Firefox error: {}".format(error_msg))
+                elif response.get("type") == "error":
+                    error_msg = response.get("message", "Unknown error")
+                    raise FirefoxError("Firefox error: {}".format(error_msg))
 
-                expected_id = message["id"]
+                responses.append(response)
 
-                message_str = json.dumps(message)
-                self.log.debug("Sending message: {}".format(message_str))
+            return responses
 
-                self.ws_connection.send(message_str)
+        except FirefoxResponseNotReceived:
+            # Re-raise timeout exceptions as-is
+            raise
+        except FirefoxError:
+            # Re-raise Firefox errors as-is
+            raise
+        except Exception as e:
+            raise FirefoxCommunicationsError("Failed to send message: {}".format(e))
+        finally:
+            if expected_ids:
+                with self._pending_cond:
+                    for expected_id in expected_ids:
+                        self._pending_responses.pop(expected_id, None)
+
+    def _wait_for_response(self, expected_id: int, timeout: float,
+                           deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait for the response to a sent command.
 
-                # Wait for response with matching ID
-                timeout = timeout if timeout is not None else self.websocket_timeout
-                start_time = time.time()
+        Args:
+            expected_id: Message ID of the sent command
+            timeout: Timeout in seconds
+            deadline: time.monotonic() value to give up at, if the timeout
+                started earlier (e.g. it is shared by a batch of commands)
 
-                while time.time() - start_time < timeout:
-                    # Calculate remaining timeout
-                    remaining_timeout = timeout - (time.time() - start_time)
-                    if remaining_timeout <= 0:
-                        break
+        Returns:
+            The response message
 
-                    try:
-                        # Pass timeout to recv() to prevent infinite blocking
-                        response_str = self.ws_connection.recv(timeout=remaining_timeout)
-                    except TimeoutError:
-                        # WebSocket timeout - break out and raise FirefoxResponseNotReceived
-                        break
+        Raises:
+            FirefoxResponseNotReceived: If no response received within timeout
+        """
+        if deadline is None:
+            deadline = time.monotonic() + timeout
+        response = self._read_until(lambda: self._pending_responses.get(expected_id), deadline)
+        if response is None:
+            raise FirefoxResponseNotReceived("Timeout waiting for response with ID {} after {} seconds".format(expected_id, timeout))
+        return response
+
+    def _read_until(self, check: Callable[[], Optional[Dict[str, Any]]], deadline: float) -> Optional[Dict[str, Any]]:
+        """
+        Take part in reading the WebSocket until check() produces a message.
+
+        If no other thread is reading the WebSocket, this thread becomes the
+        reader, dispatching every frame it reads (responses and awaited events
+        to their waiters, other events to the per-tab queues). Otherwise it
+        sleeps until the current reader delivers something or gives up the
+        reader role.
+
+        Args:
+            check: Called with _pending_cond held; returns the awaited message or None
+            deadline: time.monotonic() value to give up at
+
+        Returns:
+            The message returned by check(), or None on timeout
+        """
+        while True:
+            with self._pending_cond:
+                result = check()
+                if result is not None:
+                    return result
+
+                remaining_timeout = deadline - time.monotonic()
+                if remaining_timeout <= 0:
+                    return None
+
+                if not self.ws_lock.acquire(blocking=False):
+                    # Another thread is reading; it will notify when it delivers
+                    # a message or releases the reader role
+                    self._pending_cond.wait(remaining_timeout)
+                    continue
 
+            try:
+                try:
+                    # Pass timeout to recv() to prevent infinite blocking
+                    response_str = self.ws_connection.recv(timeout=remaining_timeout)
+                except TimeoutError:
+                    # Re-check and give up at the top of the loop
+                    continue
+
+                if self.log.isEnabledFor(logging.DEBUG):
                     self.log.debug("Received response: {}".format(response_str))
+                self._dispatch_frame(_decode_message(response_str))
+            finally:
+                self._release_reader()
 
-                    response = json.loads(response_str)
-
-                    # Check if this is the response we're waiting for
-                    if response.get("id") == expected_id:
-                        # Check for errors
-                        if "error" in response:
-                            error_msg = response.get("message", "Unknown error")
-                            if isinstance(error_msg, dict):
-                                error_msg = str(error_msg)
-                            raise FirefoxError("Firefox error: {}".format(error_msg))
-                        elif response.get("type") == "error":
-                            error_msg = response.get("message", "Unknown error")
-                            raise FirefoxError("Firefox error: {}".format(error_msg))
-
-                        return response
-
-                    # If this is an event or a response for a different message, queue it
-                    if response.get("type") == "event" or response.get("method"):
-                        # This is an event - route it to the appropriate per-tab queue
-                        method = response.get("method", "")
-                        params = response.get("params", {})
-                        context_id = None
-
-                        # For log.entryAdded events, context is nested in source.context
-                        if method == "log.entryAdded":
-                            source = params.get("source", {})
-                            if isinstance(source, dict):
-                                context_id = source.get("context")
-
-                            # Route to console queue
-                            if context_id:
-                                console_queue = self.get_console_queue_for_context(context_id)
-                                console_queue.put(response)
-                            else:
-                                # Log event without context - route to all contexts with console logging enabled
-                                with self.console_contexts_lock:
-                                    for ctx in self.console_enabled_contexts:
-                                        console_queue = self.get_console_queue_for_context(ctx)
-                                        console_queue.put(response)
-                        else:
-                            # For other events, context is directly in params
-                            if "context" in params:
-                                context_id = params["context"]
-
-                            if context_id:
-                                event_queue = self.get_event_queue_for_context(context_id)
-                                event_queue.put(response)
-                        # Continue waiting for our response
-                        continue
+    def _dispatch_frame(self, response: Dict[str, Any]) -> int:
+        """
+        Deliver a message read from the WebSocket to whoever is waiting for it.
 
-                    # If this is a response for a different message, we might want to handle it
-                    # For now, just continue waiting for our response
+        Args:
+            response: Parsed message
 
+        Returns:
+            Number of per-tab queues an event was routed to
+        """
+        if self._deliver_response(response) or self._deliver_event(response):
+            return 0
+        return self._route_event(response)
 
-                raise FirefoxResponseNotReceived("Timeout waiting for response with ID {} after {} seconds".format(expected_id, timeout))
+    def _release_reader(self):
+        """Release ws_lock and wake any threads waiting to take over reading."""
+        with self._pending_cond:
+            self.ws_lock.release()
+            self._pending_cond.notify_all()
 
-            except FirefoxResponseNotReceived:
-                # Re-raise timeout exceptions as-is
-                raise
-            except FirefoxError:
-                # Re-raise Firefox errors as-is
-                raise
-            except Exception as e:
-                raise FirefoxCommunicationsError("Failed to send message: {}".format(e))
+    def _deliver_response(self, response: Dict[str, Any]) -> bool:
+        """
+        File a command response for the thread waiting on it.
+
+        Args:
+            response: Parsed message read from the WebSocket
+
+        Returns:
+            True if the message was a response to a pending command
+        """
+        response_id = response.get("id")
+        if response_id is None:
+            return False
+
+        with self._pending_cond:
+            if response_id in self._pending_responses:
+                self._pending_responses[response_id] = response
+                self._pending_cond.notify_all()
+                return True
+
+        # Response for a command that already timed out
+        self.log.debug("Discarding response for message ID {} (no longer pending)".format(response_id))
+        return response.get("type") != "event" and not response.get("method")
+
+    def _deliver_event(self, response: Dict[str, Any]) -> bool:
+        """
+        Hand an event to a thread waiting for it in _receive_event.
+
+        Args:
+            response: Parsed message read from the WebSocket
+
+        Returns:
+            True if a waiter took the event
+        """
+        method = response.get("method")
+        if not method or method not in self._event_waiters:
+            return False
+
+        params = response.get("params", {})
+        with self._pending_cond:
+            for waiter in self._event_waiters.get(method, ()):
+                if waiter.result is None and _pattern_matches(waiter.pattern, params, False):
+                    waiter.result = response
+                    self._pending_cond.notify_all()
+                    return True
+        return False
+
+    def _route_event(self, response: Dict[str, Any]) -> int:
+        """
+        Route an event to the per-tab queue(s) it belongs to.
+
+        Args:
+            response: Parsed message read from the WebSocket
+
+        Returns:
+            Number of queues the event was delivered to
+        """
+        method = response.get("method")
+        if response.get("type") != "event" and not method:
+            return 0
+
+        method = method or ""
+        params = response.get("params", {})
+        context_id = None
+        delivered = 0
+
+        # For log.entryAdded events, context is nested in source.context
+        if method == "log.entryAdded":
+            source = params.get("source", {})
+            if isinstance(source, dict):
+                context_id = source.get("context")
+
+            # Route to console queue
+            if context_id:
+                console_queue = self.get_console_queue_for_context(context_id)
+                if console_queue.put(response):
+                    self._warn_queue_overflow("console", context_id, console_queue)
+                delivered += 1
+                self.log.debug("Routed log.entryAdded to console queue for context: {}".format(context_id))
+            else:
+                # Log event without context - route to all contexts with console logging enabled
+                with self.console_contexts_lock:
+                    for ctx in self.console_enabled_contexts:
+                        console_queue = self.get_console_queue_for_context(ctx)
+                        if console_queue.put(response):
+                            self._warn_queue_overflow("console", ctx, console_queue)
+                        delivered += 1
+                self.log.debug("Routed log.entryAdded to all console-enabled contexts")
+        else:
+            # For other events, context is directly in params
+            if "context" in params:
+                context_id = params["context"]
+
+            # If we have a context, queue it for that specific tab
+            if context_id:
+                event_queue = self.get_event_queue_for_context(context_id)
+                if event_queue.put(response):
+                    self._warn_queue_overflow("event", context_id, event_queue)
+                delivered += 1
+            else:
+                # No context - this is a global event; just log and ignore
+                self.log.debug("Received event without context: {}".format(method))
 
-    def get_event_queue_for_context(self, context_id: str) -> queue.Queue:
+        return delivered
+
+    # Maximum events held per tab queue; past this the oldest are dropped, so a
+    # tab whose events nobody consumes can't grow memory without bound
+    EVENT_QUEUE_MAX_SIZE = 10000
+
+    def _warn_queue_overflow(self, kind: str, context_id: str, event_queue: _EventQueue):
+        """Log that a full queue dropped an event (once, then every EVENT_QUEUE_MAX_SIZE drops)."""
+        if (event_queue.dropped - 1) % self.EVENT_QUEUE_MAX_SIZE == 0:
+            self.log.warning("{} queue for context {} is full; dropped {} oldest event(s) so far".format(
+                kind.capitalize(), context_id, event_queue.dropped))
+
+    def get_event_queue_for_context(self, context_id: str) -> _EventQueue:
         """Get or create the event queue for a specific browsing context."""
+        # Lock-free fast path: the queue exists for every context after its first event
+        event_queue = self.event_queues.get(context_id)
+        if event_queue is not None:
+            return event_queue
         with self.event_queues_lock:
-            if context_id not in self.event_queues:
-                self.event_queues[context_id] = queue.Queue()
-            return self.event_queues[context_id]
+            return self.event_queues.setdefault(context_id, _EventQueue(self.EVENT_QUEUE_MAX_SIZE))
 
-    def get_console_queue_for_context(self, context_id: str) -> queue.Queue:
+    def get_console_queue_for_context(self, context_id: str) -> _EventQueue:
         """Get or create the console event queue for a specific browsing context."""
+        # Lock-free fast path: the queue exists for every context after its first event
+        console_queue = self.console_queues.get(context_id)
+        if console_queue is not None:
+            return console_queue
         with self.console_queues_lock:
-            if context_id not in self.console_queues:
-                self.console_queues[context_id] = queue.Queue()
-            return self.console_queues[context_id]
+            return self.console_queues.setdefault(context_id, _EventQueue(self.EVENT_QUEUE_MAX_SIZE))
+
+    # Upper bound on frames handled by one poll_for_events() call, so a steady
+    # event stream can't keep the caller (and the reader role) indefinitely
+    POLL_MAX_FRAMES = 1000
 
     def poll_for_events(self, timeout: float = 0.1) -> int:
         """
@@ -919,6 +1659,12 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
 
         This reads from the WebSocket and distributes events to per-tab queues.
         Useful for capturing async events like network.responseCompleted and log.entryAdded.
+        Command responses read while polling are handed to the threads waiting on them.
+
+        Waits up to timeout for frames to arrive, then drains whatever is already
+        buffered (at most POLL_MAX_FRAMES frames in total) without waiting further.
+        Returns 0 without reading if another thread is reading the WebSocket
+        for the whole timeout.
 
         Args:
             timeout: How long to wait for events (seconds)
@@ -931,131 +1677,75 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
 
         events_received = 0
 
-        with self.ws_lock:  # Thread-safe WebSocket access
+        deadline = time.monotonic() + timeout
+        # Become the WebSocket reader. If another thread keeps the role for the
+        # whole timeout, it is routing events to the queues on our behalf.
+        if not self.ws_lock.acquire(timeout=timeout):
+            return 0
+        try:
+            # Poll with timeout - websockets-sync uses timeout parameter on recv()
             try:
-                # Poll with timeout - websockets-sync uses timeout parameter on recv()
-                try:
-                    while True:
-                        # Use timeout parameter on recv() instead of settimeout()
-                        response_str = self.ws_connection.recv(timeout)
-                        if not response_str:
-                            break
+                for _ in range(self.POLL_MAX_FRAMES):
+                    # Once the wait budget is spent, a zero timeout only returns
+                    # frames that have already been received
+                    remaining_timeout = max(deadline - time.monotonic(), 0)
+                    response_str = self.ws_connection.recv(timeout=remaining_timeout)
+                    if not response_str:
+                        break
 
-                        response = json.loads(response_str)
+                    response = _decode_message(response_str)
+                    if self.log.isEnabledFor(logging.DEBUG):
                         self.log.debug("Polled event/response: {}".format(response_str[:200]))
 
-                        # Distribute events to the correct per-tab queue
-                        if response.get("type") == "event" or response.get("method"):
-                            method = response.get("method", "")
-
-                            # Extract the context from the event if available
-                            context_id = None
-                            params = response.get("params", {})
-
-                            # For log.entryAdded events, context is nested in source.context
-                            if method == "log.entryAdded":
-                                source = params.get("source", {})
-                                if isinstance(source, dict):
-                                    context_id = source.get("context")
-
-                                # Route to console queue
-                                if context_id:
-                                    console_queue = self.get_console_queue_for_context(context_id)
-                                    console_queue.put(response)
-                                    events_received += 1
-                                    self.log.debug("Routed log.entryAdded to console queue for context: {}".format(context_id))
-                                else:
-                                    # Log event without context - route to all contexts with console logging enabled
-                                    with self.console_contexts_lock:
-                                        for ctx in self.console_enabled_contexts:
-                                            console_queue = self.get_console_queue_for_context(ctx)
-                                            console_queue.put(response)
-                                            events_received += 1
-                                    self.log.debug("Routed log.entryAdded to all console-enabled contexts")
-                            else:
-                                # For other events, context is directly in params
-                                if "context" in params:
-                                    context_id = params["context"]
-
-                                # If we have a context, queue it for that specific tab
-                                if context_id:
-                                    event_queue = self.get_event_queue_for_context(context_id)
-                                    event_queue.put(response)
-                                    events_received += 1
-                                else:
-                                    # No context - this is a global event, queue for all tabs
-                                    # or just log and ignore
-                                    self.log.debug("Received event without context: {}".format(method))
-                        elif "id" in response:
-                            # This is a response to a command - these aren't context-specific
-                            # Put in the first available queue or handle separately
-                            # For now, just log
-                            self.log.debug("Received command response during polling: {}".format(response.get("id")))
-
-                except TimeoutError:
-                    # Timeout is expected when polling - no more events available
-                    pass
-                except Exception as e:
-                    # Other errors - log and continue
-                    self.log.debug("Error polling for events: {}".format(e))
+                    # Hand command responses and awaited events to their waiters,
+                    # distribute other events to the correct per-tab queue
+                    events_received += self._dispatch_frame(response)
 
+            except TimeoutError:
+                # Timeout is expected when polling - no more events available
+                pass
             except Exception as e:
-                self.log.debug("Error in poll_for_events: {}".format(e))
+                # Other errors - log and continue
+                self.log.debug("Error polling for events: {}".format(e))
+        finally:
+            self._release_reader()
 
         return events_received
     
     def _receive_event(self, event_type: str, params: dict, timeout: int = 5) -> Optional[Dict[str, Any]]:
-        """Receive a specific event from the WebSocket"""
-        try:
-            # Use the websockets library's timeout parameter (not settimeout/gettimeout)
-            try:
-                response_str = self.ws_connection.recv(timeout=timeout)
-                response = json.loads(response_str)
-
-                # Check if this is the event we're looking for
-                if (response.get("method") == event_type and
-                    self._dictionaries_match(params, response.get("params", {}), False)):
-                    return response
-
-                # If it's an error, raise it
-                if response.get("type") == "error":
-                    error_msg = response.get("message", "Unknown error")
-                    raise FirefoxError("Firefox error: {}".format(error_msg))
+        """
+        Wait for a specific event from the WebSocket.
 
-                # If it's a response to a previous message, ignore it
-                if "id" in response:
-                    # This is a response to a previous request, not an event
-                    # Continue waiting for the actual event
-                    return None
+        Takes turns reading with any other waiting threads. Other frames read
+        meanwhile are dispatched normally rather than discarded.
 
-                # If we got a message but it's not what we want, continue waiting
-                return None
+        Args:
+            event_type: Event method name, e.g. 'browsingContext.domContentLoaded'
+            params: Pattern the event params must match (see _dictionaries_match)
+            timeout: Maximum time to wait in seconds
 
-            except TimeoutError:
-                # Timeout occurred - websockets library raises TimeoutError
-                return None
-            except Exception as e:
-                self.log.debug("Error receiving event: {}".format(e))
-                return None
+        Returns:
+            The event message, or None on timeout or error
+        """
+        waiter = _EventWaiter(event_type, _compile_pattern(params))
+        with self._pending_cond:
+            self._event_waiters.setdefault(event_type, []).append(waiter)
 
+        try:
+            return self._read_until(lambda: waiter.result, time.monotonic() + timeout)
         except Exception as e:
             self.log.debug("Error receiving event: {}".format(e))
             return None
+        finally:
+            with self._pending_cond:
+                waiters = self._event_waiters[event_type]
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._event_waiters[event_type]
     
     def _dictionaries_match(self, pattern: dict, data: dict, required: bool) -> bool:
         """Check if two dictionaries match (helper for event matching)"""
-        for key in pattern:
-            if required and key not in data:
-                return False
-            
-            if key in data:
-                # Equal values, up to slashes
-                if isinstance(pattern[key], dict):
-                    if not self._dictionaries_match(pattern[key], data[key], required):
-                        return False
-                elif str(data[key]).replace('/', '') != str(pattern[key]).replace('/', ''):
-                    return False
-        return True
+        return _pattern_matches(_compile_pattern(pattern), data, required)
     
     def new_tab(self, url: str = "about:blank") -> 'FirefoxRemoteDebugInterface':
         """
@@ -1068,14 +1758,9 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
             FirefoxRemoteDebugInterface instance for the new tab
         """
         try:
-            # Create a new browsing context (tab)
-            create_response = self._send_message({
-                'method': 'browsingContext.create',
-                'params': {
-                    'type': 'tab'
-                    # Use default user context for cookie persistence
-                }
-            })
+            # Create a new browsing context (tab) in the default user context,
+            # for cookie persistence
+            create_response = self._send_message(_CREATE_TAB)
 
             # Extract the new context ID
             if create_response.get('type') == 'event' and create_response.get('method') == 'browsingContext.domContentLoaded':
@@ -1100,11 +1785,13 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
             
             # Track this tab
             self.tabs[new_context] = interface
-            self.tab_id_map[new_context] = {
+            self._track_tab(new_context, {
+                'actor': new_context,
+                'type': 'tab',
                 'context_id': new_context,
                 'url': url,
                 'created_at': time.time()
-            }
+            })
             
             return interface
             
@@ -1136,16 +1823,7 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
     def _list_browsing_contexts(self):
         """List available browsing contexts (tabs/windows) using WebDriver BiDi"""
         try:
-            message = {
-                "id": self.msg_id + 1,
-                "method": "browsingContext.getTree",
-                "params": {
-                    "maxDepth": 0,
-                    "root": None
-                }
-            }
-            
-            response = self._send_message(message)
+            response = self._send_message(_GET_TOP_LEVEL_TREE)
             
             try:
                 self.log.debug("Parsing response: {}".format(response))
@@ -1172,8 +1850,14 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
                     self.log.warning("Contexts is not a list: {}".format(type(contexts)))
                     return []
                 
-                self.tabs = {}
-                self.tab_id_map = {}
+                # Nothing to rebuild if Firefox reports the same contexts as last time
+                if contexts == self._listed_contexts:
+                    return list(self.tabs.values())
+                
+                # Update the tab maps in place: tabs that still exist keep their
+                # interface (and its per-tab logging state) and info dict, so
+                # references callers hold stay valid
+                seen = set()
                 
                 for i, context in enumerate(contexts):
                     self.log.debug("Processing context {}: {}".format(i, context))
@@ -1184,29 +1868,44 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
                         self.log.warning("Context {} is not a dict: {}".format(i, type(context)))
                         continue
                     
-                    tab_info = {
-                        "actor": context.get("context", ""),
-                        "title": context.get("title", ""),
-                        "url": context.get("url", ""),
-                        "type": "tab"
-                    }
+                    actor = context.get("context", "")
+                    if not actor:  # Only add if we have a valid context
+                        continue
+                    seen.add(actor)
+                    
+                    tab_info = self.tab_id_map.get(actor)
+                    if tab_info is None:
+                        tab_info = {"actor": actor, "type": "tab"}
+                        self.tab_id_map[actor] = tab_info
+                    else:
+                        # Entries recorded by new_tab() lack the listing keys
+                        tab_info.setdefault("actor", actor)
+                        tab_info.setdefault("type", "tab")
+                        self._untrack_url(actor, tab_info.get("url"))
+                    tab_info["title"] = context.get("title", "")
+                    tab_info["url"] = context.get("url", "")
+                    self._url_to_tabs.setdefault(tab_info["url"], set()).add(actor)
                     
                     self.log.debug("Tab info: {}".format(tab_info))
                     
-                    if tab_info["actor"]:  # Only add if we have a valid context
-                        # Create an interface instance for this context
-                        interface = self._create_interface_for_context(tab_info["actor"])
-                        self.tabs[tab_info["actor"]] = interface
-                        self.tab_id_map[tab_info["actor"]] = tab_info
+                    if actor not in self.tabs:
+                        # Create an interface instance for newly seen contexts
+                        self.tabs[actor] = self._create_interface_for_context(actor)
                 
+                # Drop tabs that are gone; their interfaces share this manager's
+                # connection, so there is nothing of their own to close
+                for gone in [tab_id for tab_id in self.tabs if tab_id not in seen]:
+                    del self.tabs[gone]
+                for gone in [tab_id for tab_id in self.tab_id_map if tab_id not in seen]:
+                    self._untrack_url(gone, self.tab_id_map.pop(gone).get("url"))
+                
+                self._listed_contexts = contexts
                 self.log.info("Found {} tabs".format(len(self.tabs)))
                 return list(self.tabs.values())
                 
             except Exception as e:
-                self.log.warning("Error parsing browsing contexts: {}".format(e))
+                self.log.warning("Error parsing browsing contexts: {}".format(e), exc_info=True)
                 self.log.warning("Response was: {}".format(response))
-                import traceback
-                self.log.warning("Traceback: {}".format(traceback.format_exc()))
                 return []
                 
         except Exception as e:
@@ -1220,19 +1919,55 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
         else:
             return self._list_browsing_contexts()
     
+    def find_tabs_by_url(self, url: str) -> List[Dict[str, Any]]:
+        """
+        Find tracked tabs by URL.
+
+        Uses the URL recorded when each tab was created or last listed, not
+        any navigation done since.
+
+        Args:
+            url: Exact URL to look for
+
+        Returns:
+            Tab info dicts of the matching tabs (empty if none)
+        """
+        return [self.tab_id_map[tab_id] for tab_id in self._url_to_tabs.get(url, ())]
+
+    def _track_tab(self, tab_id: str, tab_info: Dict[str, Any]):
+        """
+        Record a tab's info in tab_id_map and the URL index.
+
+        Args:
+            tab_id: Browsing context ID of the tab
+            tab_info: Tab info dict (with a 'url' key)
+        """
+        self._listed_contexts = None
+        old_info = self.tab_id_map.get(tab_id)
+        if old_info is not None:
+            self._untrack_url(tab_id, old_info.get('url'))
+        self.tab_id_map[tab_id] = tab_info
+        self._url_to_tabs.setdefault(tab_info.get('url'), set()).add(tab_id)
+
+    def _untrack_url(self, tab_id: str, url: Optional[str]):
+        """Remove a tab from the URL index entry for url."""
+        tab_ids = self._url_to_tabs.get(url)
+        if tab_ids is not None:
+            tab_ids.discard(tab_id)
+            if not tab_ids:
+                del self._url_to_tabs[url]
+
     def get_tab(self, tab_id: str) -> Dict[str, Any]:
         """Get information about a specific tab"""
-        if tab_id not in self.tabs:
-            # Try to find the tab
-            tabs = self.list_tabs()
-            for tab in tabs:
-                if tab.get("actor") == tab_id:
-                    self.tabs[tab_id] = tab
-                    return tab
-            
-            raise FirefoxTabNotFoundError("Tab {} not found".format(tab_id))
+        tab_info = self.tab_id_map.get(tab_id)
+        if tab_info is None:
+            # Unknown tab - refresh the tab list from Firefox and look again
+            self._list_browsing_contexts()
+            tab_info = self.tab_id_map.get(tab_id)
+            if tab_info is None:
+                raise FirefoxTabNotFoundError("Tab {} not found".format(tab_id))
         
-        return self.tabs[tab_id]
+        return tab_info
     
     def navigate(self, url: str, timeout: int = 30) -> Dict[str, Any]:
         """Navigate the current browsing context to a URL using WebDriver BiDi"""
@@ -1249,25 +1984,15 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
                 }
             })['result']['navigation']
             
-            # Wait for the DOM to load
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                try:
-                    # Listen for domContentLoaded event
-                    event = self._receive_event('browsingContext.domContentLoaded', {
-                        'url': url,
-                        'context': self.browsing_context,
-                        'navigation': navigation,
-                    })
-                    
-                    if event:
-                        return {"status": "success", "url": url, "navigation": navigation}
-                    
-                    time.sleep(0.1)
-                    
-                except Exception as e:
-                    self.log.debug("Event listening error: {}".format(e))
-                    break
+            # Wait for the DOM to load. _receive_event blocks on the WebSocket
+            # until the matching event arrives, dispatching anything else it reads.
+            event = self._receive_event('browsingContext.domContentLoaded', {
+                'url': url,
+                'context': self.browsing_context,
+                'navigation': navigation,
+            }, timeout=timeout)
+            if not event:
+                self.log.debug("No domContentLoaded event for {} within {} seconds".format(url, timeout))
             
             return {"status": "success", "url": url, "navigation": navigation}
             
@@ -1308,18 +2033,7 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
         try:
             if tab_id in self.tabs:
                 # Remove the tab from tracking
-                del self.tabs[tab_id]
-                if tab_id in self.tab_id_map:
-                    del self.tab_id_map[tab_id]
-                
-                # If this was the active tab, switch to another tab or None
-                if self.browsing_context == tab_id:
-                    if self.tabs:
-                        # Switch to the first remaining tab
-                        first_tab = next(iter(self.tabs.keys()))
-                        self.browsing_context = first_tab
-                    else:
-                        self.browsing_context = None
+                self._forget_tab(tab_id)
                 
                 # Send close command to Firefox
                 self._send_message({
@@ -1335,22 +2049,107 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
             self.log.error("Failed to close tab {}: {}".format(tab_id, e))
             return False
 
-    def close_all_tabs(self) -> bool:
+    def close_tabs(self, tab_ids: List[str]) -> bool:
         """
-        Close all tabs.
-        
+        Close several tabs.
+
+        The close commands are pipelined, so closing N tabs costs one round
+        trip to Firefox rather than N.
+
+        Args:
+            tab_ids: Browsing context IDs of the tabs to close
+
         Returns:
             True if all tabs were closed successfully
         """
+        tab_ids = list(tab_ids)
+        if not tab_ids:
+            return True
+
+        for tab_id in tab_ids:
+            if tab_id in self.tabs:
+                self._forget_tab(tab_id)
+
         try:
-            # Close all tabs
-            for tab_id in list(self.tabs.keys()):
-                self.close_tab(tab_id)
+            self._send_messages([
+                {
+                    'method': 'browsingContext.close',
+                    'params': {
+                        'context': tab_id
+                    }
+                }
+                for tab_id in tab_ids
+            ])
             return True
         except Exception as e:
-            self.log.error("Failed to close all tabs: {}".format(e))
+            self.log.error("Failed to close tabs {}: {}".format(tab_ids, e))
             return False
+
+    def close_all_tabs(self) -> bool:
+        """
+        Close all tabs.
+
+        Returns:
+            True if all tabs were closed successfully
+        """
+        return self.close_tabs(list(self.tabs))
+
+    def _forget_tab(self, tab_id: str):
+        """
+        Stop tracking a tab that is being closed.
+
+        If it was the active tab, switch to another tab (or None).
+
+        Args:
+            tab_id: Browsing context ID of the tab
+        """
+        self._listed_contexts = None
+        del self.tabs[tab_id]
+        tab_info = self.tab_id_map.pop(tab_id, None)
+        if tab_info is not None:
+            self._untrack_url(tab_id, tab_info.get('url'))
+
+        if self.browsing_context == tab_id:
+            # Switch to the first remaining tab
+            self.browsing_context = next(iter(self.tabs), None)
     
+    def _wait_for_process_exit(self, timeout: float):
+        """
+        Wait for the Firefox process to exit, like Popen.wait(timeout=...).
+
+        Where pidfds are available (Linux 5.3+), waits on one so this wakes as
+        soon as the process exits, instead of Popen.wait()'s polling with
+        sleeps of up to 50ms.
+
+        Args:
+            timeout: Maximum time to wait in seconds
+
+        Raises:
+            subprocess.TimeoutExpired: If the process is still running after timeout
+        """
+        pidfd = None
+        # Only while the child is unreaped is its PID guaranteed to still be ours
+        if hasattr(os, 'pidfd_open') and self.process.returncode is None:
+            try:
+                pidfd = os.pidfd_open(self.process.pid)
+            except OSError:
+                # Kernel without pidfd support, or the process was reaped meanwhile
+                pass
+
+        if pidfd is None:
+            self.process.wait(timeout=timeout)
+            return
+
+        try:
+            # A pidfd becomes readable when the process exits
+            ready, _, _ = select.select([pidfd], [], [], timeout)
+        finally:
+            os.close(pidfd)
+        if not ready:
+            raise subprocess.TimeoutExpired(self.process.args, timeout)
+        # Reap the exited process (returns immediately)
+        self.process.wait()
+
     def close(self, graceful_timeout=20, kill_timeout=30):
         """
         Close connection and stop Firefox with graceful shutdown escalation.
@@ -1408,7 +2207,7 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
 
                     # Wait for process to terminate gracefully
                     try:
-                        self.process.wait(timeout=graceful_timeout)
+                        self._wait_for_process_exit(graceful_timeout)
                         self.log.info("Firefox terminated gracefully after SIGINT")
                     except subprocess.TimeoutExpired:
                         # Process didn't terminate, escalate to SIGKILL
@@ -1420,7 +2219,7 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
 
                             # Wait for process to die after SIGKILL
                             try:
-                                self.process.wait(timeout=kill_timeout)
+                                self._wait_for_process_exit(kill_timeout)
                                 self.log.info("Firefox killed with SIGKILL")
                             except subprocess.TimeoutExpired:
                                 self.log.error("Firefox did not terminate even after SIGKILL (waited {} seconds)".format(kill_timeout))
@@ -1490,8 +2289,8 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
         # Clean up temporary profile
         try:
             if self.temp_profile and os.path.exists(self.temp_profile):
-                shutil.rmtree(self.temp_profile)
-                self.log.debug("Cleaned up temporary profile: {}".format(self.temp_profile))
+                _remove_tree_in_background(self.temp_profile)
+                self.log.debug("Removing temporary profile in the background: {}".format(self.temp_profile))
         except Exception:
             pass
 
@@ -1500,6 +2299,8 @@ user_pref("privacy.clearOnShutdown_v2.historyFormDataAndDownloads", false);
         self.process = None
         self.tabs = {}
         self.tab_id_map = {}
+        self._url_to_tabs = {}
+        self._listed_contexts = None
         self.browsing_context = None
         self.user_context = None
         self.temp_profile = None
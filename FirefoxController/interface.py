@@ -8,6 +8,7 @@ similar to ChromeController's ChromeRemoteDebugInterface.
 """
 
 import logging
+import queue
 import time
 import json
 import base64
@@ -35,7 +36,8 @@ class FirefoxRemoteDebugInterface(WebDriverBiDiMixin):
                  headless: bool = False,
                  additional_options: List[str] = None,
                  profile_dir: str = None,
-                 manager: Optional['FirefoxExecutionManager'] = None):
+                 manager: Optional['FirefoxExecutionManager'] = None,
+                 temporary_profile: bool = False):
         """
         Initialize Firefox remote debug interface.
 
@@ -45,8 +47,11 @@ class FirefoxRemoteDebugInterface(WebDriverBiDiMixin):
             port: Debug port to use (None for automatic selection, or specify e.g. 9222)
             headless: Run Firefox in headless mode
             additional_options: Additional command line options
-            profile_dir: Custom profile directory (None for temporary profile)
+            profile_dir: Custom profile directory (None for the persistent
+                ~/.firefox_controller_profile, unless temporary_profile is set)
             manager: Optional execution manager (for multi-tab support)
+            temporary_profile: Use a throwaway profile deleted on close(), in
+                RAM-backed storage where available (ignored if profile_dir is given)
         """
         if manager:
             # Use the provided manager (for multi-tab support)
@@ -59,7 +64,8 @@ class FirefoxRemoteDebugInterface(WebDriverBiDiMixin):
                 port=port,
                 headless=headless,
                 additional_options=additional_options,
-                profile_dir=profile_dir
+                profile_dir=profile_dir,
+                temporary_profile=temporary_profile
             )
 
         self.log = logging.getLogger("FirefoxController.RemoteDebugInterface")
@@ -556,8 +562,8 @@ class FirefoxRemoteDebugInterface(WebDriverBiDiMixin):
             True if DOM became idle, False if timeout occurred
         """
         try:
-            start_time = time.time()
-            last_dom_change = time.time()
+            deadline = time.monotonic() + max_wait_timeout
+            last_dom_change = time.monotonic()
             
             script = """
                 // Get a simple DOM fingerprint
@@ -576,17 +582,18 @@ class FirefoxRemoteDebugInterface(WebDriverBiDiMixin):
                 getDOMSignature();
             """
             
-            while time.time() - start_time < max_wait_timeout:
+            while time.monotonic() < deadline:
                 current_signature = self.execute_javascript_statement(script)
                 
                 if current_signature and not current_signature.get("error"):
+                    now = time.monotonic()
                     # If DOM hasn't changed for the required time, we're idle
-                    if time.time() - last_dom_change >= dom_idle_requirement_secs:
+                    if now - last_dom_change >= dom_idle_requirement_secs:
                         return True
                     
                     # Store current signature for comparison
                     last_signature = current_signature
-                    last_dom_change = time.time()
+                    last_dom_change = now
                 
                 time.sleep(0.5)  # Check every 500ms
             
@@ -640,20 +647,22 @@ class FirefoxRemoteDebugInterface(WebDriverBiDiMixin):
             try:
                 # Non-blocking get from this tab's queue
                 event = event_queue.get_nowait()
+            except queue.Empty:
+                break
 
-                method = event.get("method")
-                self.log.debug("process_events: Got event with method={}".format(method))
+            method = event.get("method")
+            self.log.debug("process_events: Got event with method={}".format(method))
 
-                # Check if this is a network.responseCompleted event
-                if method == "network.responseCompleted":
-                    params = event.get("params", {})
-                    # Process this event (it's already in the right queue for this tab)
+            # Check if this is a network.responseCompleted event
+            if method == "network.responseCompleted":
+                params = event.get("params", {})
+                # Process this event (it's already in the right queue for this tab)
+                try:
                     self._handle_response_completed_event(params)
-                    events_processed += 1
-
-            except:
-                # Queue is empty
-                break
+                except Exception as e:
+                    self.log.warning("process_events: Failed to handle {}: {}".format(method, e))
+                    continue
+                events_processed += 1
 
         if events_processed > 0:
             self.log.debug("process_events: Processed {} network events".format(events_processed))
@@ -1068,21 +1077,23 @@ class FirefoxRemoteDebugInterface(WebDriverBiDiMixin):
             try:
                 # Non-blocking get from this tab's queue
                 event = console_queue.get_nowait()
+            except queue.Empty:
+                break
 
-                method = event.get("method")
-                self.log.debug("_process_console_events: Got event with method={}".format(method))
+            method = event.get("method")
+            self.log.debug("_process_console_events: Got event with method={}".format(method))
 
-                # Check if this is a log.entryAdded event
-                if method == "log.entryAdded":
-                    # Parse the event into a ConsoleLogEntry
+            # Check if this is a log.entryAdded event
+            if method == "log.entryAdded":
+                # Parse the event into a ConsoleLogEntry
+                try:
                     log_entry = ConsoleLogEntry.from_bidi_event(event)
-                    self._console_messages.append(log_entry)
-                    events_processed += 1
-                    self.log.debug("Captured console message: {}".format(log_entry))
-
-            except:
-                # Queue is empty
-                break
+                except Exception as e:
+                    self.log.warning("_process_console_events: Failed to parse {}: {}".format(method, e))
+                    continue
+                self._console_messages.append(log_entry)
+                events_processed += 1
+                self.log.debug("Captured console message: {}".format(log_entry))
 
         if events_processed > 0:
             self.log.debug("_process_console_events: Processed {} console events".format(events_processed))
@@ -1210,10 +1221,10 @@ class FirefoxRemoteDebugInterface(WebDriverBiDiMixin):
             self.log.warning("Console logging not enabled - call enable_console_logging() first")
             return None
 
-        start_time = time.time()
+        deadline = time.monotonic() + timeout
         checked_count = 0  # Track how many messages we've already checked
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() < deadline:
             # Poll for new events
             self.poll_console_events(poll_interval)
 
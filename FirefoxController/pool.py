@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+"""
+Firefox Instance Pool
+
+Keeps running Firefox instances around between sessions, so short scripted
+sessions don't each pay for starting Firefox, setting up a profile and
+negotiating a WebDriver BiDi session.
+"""
+
+import collections
+import contextlib
+import logging
+import threading
+from typing import Optional
+
+from .execution_manager import FirefoxExecutionManager
+from .exceptions import BrowserTimeoutError, FirefoxControllerException
+
+
+class FirefoxPool:
+    """
+    Pool of started and connected FirefoxExecutionManager instances.
+
+    Instances are started on demand, up to size at once. release() resets an
+    instance (extra tabs closed, default tab back on about:blank, queued events
+    dropped) and keeps it running for the next acquire().
+
+    Example:
+        with FirefoxPool(size=2, headless=True) as pool:
+            with pool.session() as manager:
+                tab = manager.new_tab("https://example.com")
+    """
+
+    def __init__(self, size: int = 2, max_uses: Optional[int] = None, **manager_kwargs):
+        """
+        Initialize the pool. No Firefox is started until the first acquire().
+
+        Args:
+            size: Maximum number of Firefox instances running at once
+            max_uses: Sessions an instance serves before it is closed and
+                replaced (None to reuse instances indefinitely)
+            **manager_kwargs: Arguments for each FirefoxExecutionManager. Each
+                instance gets its own port and a temporary profile.
+
+        Raises:
+            ValueError: If size is less than 1, or a fixed port or profile_dir
+                (which instances can't share) is given
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1, got {}".format(size))
+        if manager_kwargs.get('port') is not None:
+            raise ValueError("Pooled instances need their own ports; don't pass port")
+        if manager_kwargs.get('profile_dir') is not None:
+            raise ValueError("Pooled instances need their own profiles; don't pass profile_dir")
+        manager_kwargs['temporary_profile'] = True
+
+        self.size = size
+        self.max_uses = max_uses
+        self.manager_kwargs = manager_kwargs
+        self.log = logging.getLogger("FirefoxController.Pool")
+
+        self._idle = collections.deque()  # Running managers not checked out
+        self._uses = {}  # manager -> number of sessions served
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def acquire(self, timeout: Optional[float] = None) -> FirefoxExecutionManager:
+        """
+        Check out a running, connected Firefox instance.
+
+        Args:
+            timeout: Seconds to wait for a free instance (None to wait forever)
+
+        Returns:
+            A FirefoxExecutionManager; hand it back with release()
+
+        Raises:
+            BrowserTimeoutError: If no instance became free within timeout
+            FirefoxControllerException: If the pool is closed, or a new
+                instance fails to start
+        """
+        if self._closed:
+            raise FirefoxControllerException("Pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise BrowserTimeoutError("No Firefox instance became free within {} seconds".format(timeout))
+
+        try:
+            manager = self._take_idle_manager()
+            if manager is None:
+                manager = self._start_manager()
+            with self._lock:
+                self._uses[manager] = self._uses.get(manager, 0) + 1
+            return manager
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, manager: FirefoxExecutionManager):
+        """
+        Return an instance checked out with acquire().
+
+        The instance is reset and kept for reuse, or closed if it has served
+        max_uses sessions, can't be reset, or the pool has been closed.
+
+        Args:
+            manager: Instance returned by acquire()
+        """
+        try:
+            with self._lock:
+                uses = self._uses.get(manager, 0)
+            worn_out = self.max_uses is not None and uses >= self.max_uses
+            if not self._closed and not worn_out and self._reset_manager(manager):
+                with self._lock:
+                    if not self._closed:
+                        self._idle.append(manager)
+                        return
+            self._close_manager(manager)
+        finally:
+            self._slots.release()
+
+    @contextlib.contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """
+        Context manager that acquires an instance and releases it on exit.
+
+        Args:
+            timeout: Seconds to wait for a free instance (None to wait forever)
+
+        Yields:
+            A running, connected FirefoxExecutionManager
+        """
+        manager = self.acquire(timeout)
+        try:
+            yield manager
+        finally:
+            self.release(manager)
+
+    def close(self):
+        """Close all idle instances. Checked-out instances are closed when released."""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for manager in idle:
+            self._close_manager(manager)
+
+    def _take_idle_manager(self) -> Optional[FirefoxExecutionManager]:
+        """
+        Take a still-running instance from the idle list.
+
+        Instances whose Firefox has exited while idle are closed and skipped.
+
+        Returns:
+            An idle FirefoxExecutionManager, or None if there is none
+        """
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                manager = self._idle.popleft()
+            if self._is_alive(manager):
+                return manager
+            self.log.info("Idle pooled Firefox instance on port {} is gone, replacing it".format(manager.port))
+            self._close_manager(manager)
+
+    @staticmethod
+    def _is_alive(manager: FirefoxExecutionManager) -> bool:
+        """Return True if the instance's Firefox is running and connected."""
+        return manager.process is not None and manager.process.poll() is None and bool(manager.ws_connection)
+
+    @staticmethod
+    def _logging_active(manager: FirefoxExecutionManager) -> bool:
+        """Return True if any request or console logging is still enabled on the instance."""
+        return bool(
+            manager.network_logging_refs or manager.network_events_subscribed or
+            manager.logging_enabled_contexts or manager._logging_interfaces or
+            manager.console_logging_refs or manager.console_events_subscribed or
+            manager.console_enabled_contexts or manager._console_interfaces
+        )
+
+    def _start_manager(self) -> FirefoxExecutionManager:
+        """Start and connect a new Firefox instance."""
+        manager = FirefoxExecutionManager(**self.manager_kwargs)
+        try:
+            manager.start_firefox()
+            manager.connect()
+        except Exception:
+            manager.close()
+            raise
+        self.log.info("Started pooled Firefox instance on port {}".format(manager.port))
+        return manager
+
+    def _reset_manager(self, manager: FirefoxExecutionManager) -> bool:
+        """
+        Put an instance back into a clean state for the next session.
+
+        Args:
+            manager: Instance to reset
+
+        Returns:
+            True if the instance is still running and was reset
+        """
+        if not self._is_alive(manager):
+            self.log.info("Pooled Firefox instance on port {} is gone, replacing it".format(manager.port))
+            return False
+
+        if self._logging_active(manager):
+            # Firefox keeps the session's event subscriptions, and the logging
+            # ref counts belong to interfaces of the previous session
+            self.log.info("Pooled Firefox instance on port {} still has logging enabled, replacing it".format(
+                manager.port))
+            return False
+
+        default_tab = manager.browsing_context
+        if not default_tab:
+            self.log.info("Pooled Firefox instance on port {} has no default tab, replacing it".format(manager.port))
+            return False
+
+        try:
+            # Refresh first so popups and window.open() tabs are closed too,
+            # then close every tab except the default one (closing the last
+            # tab could make Firefox exit)
+            manager._list_browsing_contexts()
+            extra_tabs = [tab_id for tab_id in manager.tabs if tab_id != default_tab]
+            if not manager.close_tabs(extra_tabs):
+                self.log.warning("Failed to close tabs of pooled Firefox instance on port {}".format(manager.port))
+                return False
+
+            manager._send_message({
+                'method': 'browsingContext.navigate',
+                'params': {
+                    'context': default_tab,
+                    'url': 'about:blank',
+                    'wait': 'complete'
+                }
+            })
+        except Exception as e:
+            self.log.warning("Failed to reset pooled Firefox instance on port {}: {}".format(manager.port, e))
+            return False
+
+        # Drop events left over from the previous session
+        with manager.event_queues_lock:
+            manager.event_queues.clear()
+        with manager.console_queues_lock:
+            manager.console_queues.clear()
+        return True
+
+    def _close_manager(self, manager: FirefoxExecutionManager):
+        """Close an instance and forget it."""
+        with self._lock:
+            self._uses.pop(manager, None)
+        try:
+            manager.close()
+        except Exception as e:
+            self.log.warning("Error closing pooled Firefox instance: {}".format(e))
+
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
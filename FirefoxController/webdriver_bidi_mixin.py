@@ -18,7 +18,7 @@ from .bidi_types import (
     validate_browsing_context_type, validate_navigation_type, validate_url,
     validate_screenshot_format, validate_clip_region, validate_cookie,
     validate_network_phases, validate_cookie_same_site,
-    BiDiTypeError, BiDiValidationError, BiDiTypeValidator
+    BiDiTypeError, BiDiValidationError, BiDiTypeValidator, parse_result_value
 )
 
 # Import exceptions
@@ -520,30 +520,7 @@ class WebDriverBiDiMixin:
                     result_obj = result_obj['result']
                 
                 # Now parse the actual result
-                if isinstance(result_obj, dict):
-                    # Handle special types
-                    if result_obj.get('type') == 'undefined':
-                        return None
-                    elif result_obj.get('type') == 'null':
-                        return None
-                    elif result_obj.get('type') == 'object':
-                        # Handle complex objects
-                        if 'value' in result_obj and isinstance(result_obj['value'], list):
-                            # Convert array of key-value pairs to dictionary
-                            result_dict = {}
-                            for key, value_obj in result_obj['value']:
-                                if isinstance(value_obj, dict) and 'value' in value_obj:
-                                    result_dict[key] = value_obj['value']
-                                else:
-                                    result_dict[key] = value_obj
-                            return result_dict
-                    elif 'type' in result_obj and 'value' in result_obj:
-                        # Handle simple types (string, number, boolean, etc.)
-                        return result_obj['value']
-                    elif 'value' in result_obj:
-                        return result_obj['value']
-                
-                return result_obj
+                return parse_result_value(result_obj)
             else:
                 return None
                 
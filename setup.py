@@ -32,10 +32,13 @@ setup(
         "dev": [
             "pytest>=7.0",
         ],
+        "fast": [
+            "orjson>=3.0",
+        ],
     },
     entry_points={
         "console_scripts": [
-            "firefoxcontroller=FirefoxController.firefox_controller:main",
+            "firefoxcontroller=FirefoxController.utils:main",
             "firefox-patch-webdriver=FirefoxController.webdriver_patch:main",
         ],
     },
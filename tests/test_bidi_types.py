@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+
+"""
+Tests for the WebDriver-BiDi type validators in bidi_types.
+
+These are pure unit tests and do not require a running Firefox instance.
+"""
+
+import enum
+import sys
+
+import pytest
+from unittest import mock
+
+from FirefoxController import bidi_types
+from FirefoxController.bidi_types import (
+    BiDiTypeError,
+    BiDiValidationError,
+    BrowsingContextType,
+    NavigationType,
+    NetworkPhase,
+    CookieSameSite,
+    ScriptResultType,
+    LogLevel,
+    LogSource,
+    validate_browsing_context_type,
+    validate_navigation_type,
+    validate_network_phases,
+    validate_cookie_same_site,
+    validate_script_result_type,
+    validate_log_level,
+    validate_log_source,
+    validate_url,
+    validate_browsing_context_id,
+    parse_script_result,
+    parse_result_value,
+    BiDiTypeValidator,
+    validate_method_parameters,
+    validate_response,
+    METHOD_SCHEMAS,
+    get_method_schema,
+    validate_cookie,
+    validate_json_data,
+    validate_base64_data,
+    ConsoleLogEntry,
+    validate_screenshot_format,
+    validate_clip_region,
+)
+
+
+# ---------------------------------------------------------------------------
+# Enum-backed validators
+# ---------------------------------------------------------------------------
+
+class TestEnumValidators:
+    """Test the validators that check a value against an Enum's values."""
+
+    @pytest.mark.parametrize("validator, enum_cls", [
+        (validate_browsing_context_type, BrowsingContextType),
+        (validate_navigation_type, NavigationType),
+        (validate_cookie_same_site, CookieSameSite),
+        (validate_script_result_type, ScriptResultType),
+        (validate_log_level, LogLevel),
+        (validate_log_source, LogSource),
+    ])
+    def test_accepts_every_enum_value(self, validator, enum_cls):
+        """Every declared enum value should validate to itself."""
+        for member in enum_cls:
+            assert validator(member.value) == member.value
+
+    @pytest.mark.parametrize("validator, enum_cls", [
+        (validate_browsing_context_type, BrowsingContextType),
+        (validate_navigation_type, NavigationType),
+        (validate_cookie_same_site, CookieSameSite),
+        (validate_script_result_type, ScriptResultType),
+        (validate_log_level, LogLevel),
+        (validate_log_source, LogSource),
+    ])
+    def test_accepts_enum_members(self, validator, enum_cls):
+        """Enum members should be normalized to their values."""
+        for member in enum_cls:
+            assert validator(member) == member.value
+
+    @pytest.mark.parametrize("validator", [
+        validate_browsing_context_type,
+        validate_navigation_type,
+        validate_cookie_same_site,
+        validate_script_result_type,
+        validate_log_level,
+        validate_log_source,
+    ])
+    def test_rejects_unhashable_value(self, validator):
+        """Unhashable values should raise BiDiTypeError, not TypeError."""
+        with pytest.raises(BiDiTypeError):
+            validator(["tab"])
+
+    @pytest.mark.parametrize("validator", [
+        validate_browsing_context_type,
+        validate_navigation_type,
+        validate_cookie_same_site,
+        validate_script_result_type,
+        validate_log_level,
+        validate_log_source,
+    ])
+    def test_rejects_unknown_value(self, validator):
+        """Unknown values should raise BiDiTypeError."""
+        with pytest.raises(BiDiTypeError):
+            validator("not-a-valid-value")
+
+    def test_error_lists_valid_values(self):
+        """The error message should name the valid values in declaration order."""
+        with pytest.raises(BiDiTypeError, match="'tab', 'window'"):
+            validate_browsing_context_type("popup")
+
+    def test_network_phases_valid(self):
+        """All network phases should validate and keep their order."""
+        phases = [p.value for p in NetworkPhase]
+        assert validate_network_phases(phases) == phases
+
+    def test_network_phases_invalid(self):
+        """A single bad phase should fail the whole list."""
+        with pytest.raises(BiDiTypeError, match="bogusPhase"):
+            validate_network_phases(["beforeRequestSent", "bogusPhase"])
+
+    def test_network_phases_reports_all_invalid(self):
+        """Every invalid phase should be named in the error."""
+        with pytest.raises(BiDiTypeError, match="'bad1', 'bad2'"):
+            validate_network_phases(["bad1", "responseStarted", "bad2"])
+
+    def test_network_phases_returns_new_list(self):
+        """The validated list should be a copy, not the caller's object."""
+        phases = ["responseStarted"]
+        validated = validate_network_phases(phases)
+        assert validated == phases
+        assert validated is not phases
+
+    def test_network_phases_accepts_enum_members(self):
+        """Enum members should be normalized to their values."""
+        assert validate_network_phases([NetworkPhase.AUTH_REQUIRED, "responseStarted"]) == \
+            ["authRequired", "responseStarted"]
+
+    def test_network_phases_unhashable(self):
+        """An unhashable phase should raise BiDiTypeError, not TypeError."""
+        with pytest.raises(BiDiTypeError, match="Invalid network phases"):
+            validate_network_phases(["responseStarted", ["authRequired"]])
+
+    def test_network_phases_accepts_iterator(self):
+        """A one-shot iterable should be consumed once and returned as a list."""
+        phases = iter(["beforeRequestSent", "responseCompleted"])
+        assert validate_network_phases(phases) == ["beforeRequestSent", "responseCompleted"]
+
+
+# ---------------------------------------------------------------------------
+# URL validation
+# ---------------------------------------------------------------------------
+
+class TestValidateUrl:
+    """Test validate_url scheme checking."""
+
+    @pytest.mark.parametrize("url", [
+        "http://example.com",
+        "https://example.com/path?q=1",
+        "about:blank",
+        "data:text/html,<p>hi</p>",
+    ])
+    def test_accepts_supported_schemes(self, url):
+        """Supported schemes should be returned unchanged."""
+        assert validate_url(url) == url
+
+    @pytest.mark.parametrize("url", ["ftp://example.com", "example.com", "javascript:alert(1)"])
+    def test_rejects_unsupported_schemes(self, url):
+        """Other schemes should raise BiDiValidationError."""
+        with pytest.raises(BiDiValidationError, match="Invalid URL format"):
+            validate_url(url)
+
+    @pytest.mark.parametrize("url", ["", None, 42])
+    def test_rejects_non_strings(self, url):
+        """Empty or non-string URLs should raise BiDiValidationError."""
+        with pytest.raises(BiDiValidationError, match="non-empty string"):
+            validate_url(url)
+
+
+# ---------------------------------------------------------------------------
+# Screenshot format validation
+# ---------------------------------------------------------------------------
+
+class TestValidateScreenshotFormat:
+    """Test validate_screenshot_format normalization."""
+
+    @pytest.mark.parametrize("fmt, expected", [
+        ("png", "png"), ("jpeg", "jpeg"), ("webp", "webp"),
+        ("PNG", "png"), ("Jpeg", "jpeg"),
+    ])
+    def test_normalizes_case(self, fmt, expected):
+        """Formats should be accepted case-insensitively and returned lowercase."""
+        assert validate_screenshot_format(fmt) == expected
+
+    def test_rejects_unknown(self):
+        """Unknown formats should raise BiDiTypeError."""
+        with pytest.raises(BiDiTypeError, match="Invalid screenshot format 'gif'"):
+            validate_screenshot_format("gif")
+
+
+# ---------------------------------------------------------------------------
+# Clip region validation
+# ---------------------------------------------------------------------------
+
+class TestValidateClipRegion:
+    """Test validate_clip_region field checking."""
+
+    def test_valid(self):
+        """A complete non-negative region should be returned as-is."""
+        clip = {'x': 0, 'y': 10, 'width': 100, 'height': 50}
+        assert validate_clip_region(clip) is clip
+
+    def test_missing_field(self):
+        """The first missing field should be named."""
+        with pytest.raises(BiDiValidationError, match="missing required field: width"):
+            validate_clip_region({'x': 0, 'y': 0, 'height': 5})
+
+    @pytest.mark.parametrize("field, bad_value", [
+        ('x', -1), ('y', 1.5), ('width', '10'), ('height', None), ('width', True),
+        ('height', -1), ('y', -(1 << 70)),
+    ])
+    def test_bad_field(self, field, bad_value):
+        """Negative, non-integer and boolean values should be rejected."""
+        clip = {'x': 0, 'y': 0, 'width': 10, 'height': 10}
+        clip[field] = bad_value
+        with pytest.raises(BiDiValidationError, match="'{}' must be a non-negative integer".format(field)):
+            validate_clip_region(clip)
+
+    def test_int_subclasses_accepted(self):
+        """int subclasses other than bool (e.g. IntEnum members) should be accepted."""
+        class Size(enum.IntEnum):
+            THUMB = 64
+
+        clip = {'x': 0, 'y': 0, 'width': Size.THUMB, 'height': Size.THUMB}
+        assert validate_clip_region(clip) is clip
+
+    def test_not_a_dict(self):
+        """Non-dict regions should raise."""
+        with pytest.raises(BiDiValidationError, match="must be a dictionary"):
+            validate_clip_region((0, 0, 10, 10))
+
+
+# ---------------------------------------------------------------------------
+# Browsing context ID validation
+# ---------------------------------------------------------------------------
+
+class TestValidateBrowsingContextId:
+    """Test validate_browsing_context_id format checking."""
+
+    @pytest.mark.parametrize("context_id", [
+        "6b1b5a4e-0f3c-4d8e-9a7b-2c1d0e9f8a7b",
+        "{6b1b5a4e-0f3c-4d8e-9a7b-2c1d0e9f8a7b}",
+        "8589934593",
+    ])
+    def test_accepts_uuid_like_ids(self, context_id):
+        """UUID-like context IDs should be returned unchanged."""
+        assert validate_browsing_context_id(context_id) == context_id
+
+    @pytest.mark.parametrize("context_id", [
+        "short",
+        "x" * 101,
+        "has spaces in the id",
+        "6b1b5a4e-0f3c-4d8e-9a7b-2c1d0e9f8a7b\n",
+    ])
+    def test_rejects_malformed_ids(self, context_id):
+        """IDs with bad length or characters should raise BiDiValidationError."""
+        with pytest.raises(BiDiValidationError, match="Invalid browsing context ID"):
+            validate_browsing_context_id(context_id)
+
+    @pytest.mark.parametrize("context_id", ["", None, 1234567890])
+    def test_rejects_non_strings(self, context_id):
+        """Empty or non-string IDs should raise BiDiValidationError."""
+        with pytest.raises(BiDiValidationError, match="non-empty string"):
+            validate_browsing_context_id(context_id)
+
+    def test_accepts_str_subclass(self):
+        """A str subclass should take the isinstance fallback and still validate."""
+        class ContextId(str):
+            pass
+        context_id = ContextId("6b1b5a4e-0f3c-4d8e-9a7b-2c1d0e9f8a7b")
+        assert validate_browsing_context_id(context_id) == context_id
+
+
+# ---------------------------------------------------------------------------
+# Script result parsing
+# ---------------------------------------------------------------------------
+
+class TestParseScriptResult:
+    """Test parse_script_result's handling of remote value types."""
+
+    @staticmethod
+    def _wrap(remote_value):
+        """Wrap a remote value the way script.evaluate responses do."""
+        return {'type': 'success', 'result': {'type': 'success', 'result': remote_value}}
+
+    @pytest.mark.parametrize("remote_type", ["undefined", "null"])
+    def test_empty_types_return_none(self, remote_type):
+        """undefined and null results should parse to None."""
+        assert parse_script_result(self._wrap({'type': remote_type})) is None
+
+    def test_simple_value(self):
+        """Simple typed values should unwrap to their value."""
+        assert parse_script_result(self._wrap({'type': 'string', 'value': 'hi'})) == 'hi'
+        assert parse_script_result(self._wrap({'type': 'number', 'value': 42})) == 42
+
+    def test_object_value(self):
+        """Objects serialized as key-value pairs should become dicts."""
+        remote = {'type': 'object', 'value': [
+            ['a', {'type': 'number', 'value': 1}],
+            ['b', 'raw'],
+        ]}
+        assert parse_script_result(self._wrap(remote)) == {'a': 1, 'b': 'raw'}
+
+    def test_object_without_pairs_is_returned_as_is(self):
+        """Objects without a key-value list are returned unchanged."""
+        remote = {'type': 'object', 'handle': 'abc'}
+        assert parse_script_result(self._wrap(remote)) == remote
+
+    def test_flat_result(self):
+        """Results without the nested envelope should also parse."""
+        assert parse_script_result({'type': 'success', 'result': {'type': 'boolean', 'value': True}}) is True
+
+    def test_exception_returns_none(self):
+        """Exception responses should parse to None."""
+        assert parse_script_result({'type': 'exception'}) is None
+
+    def test_parse_result_value(self):
+        """A bare remote value should parse without the response envelope."""
+        assert parse_result_value({'type': 'number', 'value': 7}) == 7
+        assert parse_result_value('raw') == 'raw'
+
+    def test_invalid_response_type(self):
+        """Unknown response types should raise BiDiValidationError."""
+        with pytest.raises(BiDiValidationError):
+            parse_script_result({'type': 'bogus'})
+
+
+# ---------------------------------------------------------------------------
+# Schema-driven parameter validation
+# ---------------------------------------------------------------------------
+
+class TestValidateMethodParameters:
+    """Test BiDiTypeValidator.validate_method_parameters against method schemas."""
+
+    def test_registered_schema_valid(self):
+        """Valid navigate parameters should pass through the registered schema."""
+        schema = get_method_schema('browsingContext.navigate')['parameters']
+        params = {'context': '6b1b5a4e-0f3c-4d8e-9a7b-2c1d0e9f8a7b', 'url': 'about:blank', 'wait': 'complete'}
+        assert BiDiTypeValidator.validate_method_parameters('browsingContext.navigate', params, schema) == params
+
+    def test_unknown_params_are_dropped(self):
+        """Parameters not in the schema should not be returned."""
+        schema = get_method_schema('script.evaluate')['parameters']
+        params = {'expression': '1', 'target': {}, 'extra': True}
+        validated = BiDiTypeValidator.validate_method_parameters('script.evaluate', params, schema)
+        assert validated == {'expression': '1', 'target': {}}
+
+    def test_missing_required(self):
+        """A missing required parameter should raise."""
+        schema = get_method_schema('script.evaluate')['parameters']
+        with pytest.raises(BiDiValidationError, match="Missing required parameter 'target'"):
+            BiDiTypeValidator.validate_method_parameters('script.evaluate', {'expression': '1'}, schema)
+
+    def test_wrong_type(self):
+        """A parameter of the wrong type should raise."""
+        schema = get_method_schema('script.evaluate')['parameters']
+        params = {'expression': '1', 'target': {}, 'awaitPromise': 'yes'}
+        with pytest.raises(BiDiValidationError, match="'awaitPromise' must be a boolean"):
+            BiDiTypeValidator.validate_method_parameters('script.evaluate', params, schema)
+
+    def test_custom_validator_runs(self):
+        """Schema validators should run on the parameter value."""
+        schema = get_method_schema('browsingContext.create')['parameters']
+        with pytest.raises(BiDiTypeError):
+            BiDiTypeValidator.validate_method_parameters('browsingContext.create', {'type': 'popup'}, schema)
+
+    def test_params_must_be_dict(self):
+        """Non-dict parameters should raise."""
+        schema = get_method_schema('script.evaluate')['parameters']
+        with pytest.raises(BiDiValidationError, match="must be a dictionary"):
+            BiDiTypeValidator.validate_method_parameters('script.evaluate', [], schema)
+
+    def test_param_names_are_not_code(self):
+        """Parameter names with quotes or braces should be handled as plain data."""
+        schema = {"it's {odd}": {'type': 'string', 'required': True}}
+        params = {"it's {odd}": 'ok'}
+        assert BiDiTypeValidator.validate_method_parameters('x', params, schema) == params
+        with pytest.raises(BiDiValidationError, match="Missing required parameter 'it's"):
+            BiDiTypeValidator.validate_method_parameters('x', {}, schema)
+
+    def test_schemas_are_read_only(self):
+        """METHOD_SCHEMAS and its nested tables should not be mutable."""
+        schema = get_method_schema('browsingContext.navigate')
+        with pytest.raises(TypeError):
+            schema['parameters']['url'] = {'type': 'integer'}
+        with pytest.raises(TypeError):
+            schema['parameters']['url']['required'] = False
+
+    def test_method_table_is_read_only(self):
+        """The top-level METHOD_SCHEMAS mapping should not be mutable."""
+        with pytest.raises(TypeError):
+            METHOD_SCHEMAS['browsingContext.navigate'] = {}
+        assert get_method_schema('browsingContext.navigate') is METHOD_SCHEMAS['browsingContext.navigate']
+
+    def test_unknown_method_schema(self):
+        """Unknown methods should have no schema."""
+        assert get_method_schema('no.suchMethod') is None
+
+    def test_ad_hoc_schema(self):
+        """Schemas that are not in METHOD_SCHEMAS should still be validated."""
+        schema = {
+            'count': {'type': 'integer', 'required': True},
+            'mode': {'type': 'enum', 'values': ['a', 'b']},
+        }
+        assert BiDiTypeValidator.validate_method_parameters('x', {'count': 3, 'mode': 'a'}, schema) == {'count': 3, 'mode': 'a'}
+        with pytest.raises(BiDiValidationError, match="must be one of"):
+            BiDiTypeValidator.validate_method_parameters('x', {'count': 3, 'mode': 'c'}, schema)
+        with pytest.raises(BiDiValidationError, match="must be an integer"):
+            BiDiTypeValidator.validate_method_parameters('x', {'count': 'three'}, schema)
+
+    def test_ad_hoc_schema_is_not_compiled(self):
+        """Unregistered schemas should be walked directly, and see later edits to the schema."""
+        schema = {'count': {'type': 'integer'}}
+        with mock.patch.object(bidi_types, '_compile_param_validator') as compile_validator:
+            assert BiDiTypeValidator.validate_method_parameters('x', {'count': 3}, schema) == {'count': 3}
+            schema['count']['required'] = True
+            with pytest.raises(BiDiValidationError, match="Missing required parameter 'count'"):
+                BiDiTypeValidator.validate_method_parameters('x', {}, schema)
+        compile_validator.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Response validation
+# ---------------------------------------------------------------------------
+
+class TestValidateResponse:
+    """Test validate_response and the BiDiTypeValidator namespace."""
+
+    def test_success_response_checks_result(self):
+        """Success results should be validated against the result schema."""
+        schema = get_method_schema('browsingContext.create')['response']
+        response = {'type': 'success', 'result': {'context': '6b1b5a4e-0f3c-4d8e-9a7b-2c1d0e9f8a7b'}}
+        assert validate_response('browsingContext.create', response, schema) is response
+        with pytest.raises(BiDiValidationError, match="'context' must be"):
+            validate_response('browsingContext.create', {'type': 'success', 'result': {'context': 1}}, schema)
+
+    @pytest.mark.parametrize("response, message", [
+        ({}, "missing 'type'"),
+        ({'type': 'bogus'}, "Invalid response type"),
+        ({'type': 'success'}, "missing 'result'"),
+        ({'type': 'error'}, "missing 'error'"),
+    ])
+    def test_malformed_responses(self, response, message):
+        """Structurally invalid responses should raise BiDiValidationError."""
+        with pytest.raises(BiDiValidationError, match=message):
+            validate_response('x', response, {})
+
+    def test_class_namespace_aliases(self):
+        """BiDiTypeValidator should expose the module-level functions."""
+        assert BiDiTypeValidator.validate_method_parameters is validate_method_parameters
+        assert BiDiTypeValidator.validate_response is validate_response
+
+
+# ---------------------------------------------------------------------------
+# Cookie validation
+# ---------------------------------------------------------------------------
+
+class TestValidateCookie:
+    """Test validate_cookie field checking."""
+
+    def test_full_cookie(self):
+        """A cookie with every field set correctly should be returned as-is."""
+        cookie = {
+            'name': 'session', 'value': 'abc', 'domain': 'example.com', 'path': '/',
+            'secure': True, 'httpOnly': False, 'sameSite': 'lax', 'expiry': 1700000000,
+        }
+        assert validate_cookie(cookie) is cookie
+
+    @pytest.mark.parametrize("missing", ['name', 'value'])
+    def test_missing_required(self, missing):
+        """name and value are required."""
+        cookie = {'name': 'a', 'value': 'b'}
+        del cookie[missing]
+        with pytest.raises(BiDiValidationError, match="missing required field: {}".format(missing)):
+            validate_cookie(cookie)
+
+    @pytest.mark.parametrize("field, bad_value", [
+        ('name', 1),
+        ('value', None),
+        ('domain', 5),
+        ('secure', 'yes'),
+        ('expiry', '1700000000'),
+    ])
+    def test_wrong_field_type(self, field, bad_value):
+        """Fields of the wrong type should raise."""
+        cookie = {'name': 'a', 'value': 'b'}
+        cookie[field] = bad_value
+        with pytest.raises(BiDiValidationError, match="'{}' must be".format(field)):
+            validate_cookie(cookie)
+
+    def test_same_site_enum_member(self):
+        """sameSite may be given as a CookieSameSite member."""
+        cookie = {'name': 'a', 'value': 'b', 'sameSite': CookieSameSite.LAX}
+        assert validate_cookie(cookie) is cookie
+
+    def test_invalid_same_site(self):
+        """sameSite goes through validate_cookie_same_site."""
+        with pytest.raises(BiDiTypeError):
+            validate_cookie({'name': 'a', 'value': 'b', 'sameSite': 'sometimes'})
+
+    def test_not_a_dict(self):
+        """Non-dict cookies should raise."""
+        with pytest.raises(BiDiValidationError, match="must be a dictionary"):
+            validate_cookie([('name', 'a')])
+
+
+# ---------------------------------------------------------------------------
+# JSON data validation
+# ---------------------------------------------------------------------------
+
+class TestValidateJsonData:
+    """Test validate_json_data."""
+
+    @pytest.mark.parametrize("data", [
+        None, True, 1, 1.5, "text",
+        [1, "a", None],
+        (1, 2),
+        {"a": {"b": [1, {"c": False}]}},
+        {1: "int keys are allowed"},
+    ])
+    def test_serializable(self, data):
+        """JSON-encodable data should be returned unchanged."""
+        assert validate_json_data(data) is data
+
+    @pytest.mark.parametrize("data", [
+        object(),
+        {"a": {1, 2}},
+        [b"bytes"],
+        {("tuple", "key"): 1},
+    ])
+    def test_not_serializable(self, data):
+        """Data json cannot encode should raise BiDiValidationError."""
+        with pytest.raises(BiDiValidationError, match="not JSON-serializable"):
+            validate_json_data(data)
+
+    def test_circular_reference(self):
+        """Circular structures should raise BiDiValidationError, not RecursionError."""
+        data = []
+        data.append(data)
+        with pytest.raises(BiDiValidationError, match="not JSON-serializable"):
+            validate_json_data(data)
+
+    def test_shared_reference(self):
+        """A container referenced twice (but not circularly) is still valid."""
+        shared = {"k": [1, 2]}
+        data = [shared, shared]
+        assert validate_json_data(data) is data
+
+    def test_deep_nesting(self):
+        """Nesting deeper than the recursion limit should not fail the walk."""
+        data = inner = []
+        for _ in range(sys.getrecursionlimit() * 2):
+            inner.append([])
+            inner = inner[0]
+        assert validate_json_data(data) is data
+
+
+# ---------------------------------------------------------------------------
+# Base64 validation
+# ---------------------------------------------------------------------------
+
+class TestValidateBase64Data:
+    """Test validate_base64_data decoding."""
+
+    @pytest.mark.parametrize("data", ["aGVsbG8=", b"aGVsbG8=", "aGVs\nbG8="])
+    def test_decodes(self, data):
+        """str and bytes input should decode, ignoring embedded newlines."""
+        assert validate_base64_data(data) == b"hello"
+
+    @pytest.mark.parametrize("data", ["aGVsbG8", "h\u00e9llo", None])
+    def test_invalid(self, data):
+        """Bad padding, non-ASCII text and non-string input should raise."""
+        with pytest.raises(BiDiValidationError, match="Invalid base64 data"):
+            validate_base64_data(data)
+
+
+# ---------------------------------------------------------------------------
+# Console log entries
+# ---------------------------------------------------------------------------
+
+class TestConsoleLogEntry:
+    """Test ConsoleLogEntry construction and conversion."""
+
+    def test_uses_slots(self):
+        """Entries should not carry a per-instance __dict__."""
+        entry = ConsoleLogEntry('info', 'console', 'hello', 1)
+        assert not hasattr(entry, '__dict__')
+        with pytest.raises(AttributeError):
+            entry.unexpected = True
+
+    def test_to_dict_omits_empty_optionals(self):
+        """to_dict should only include optional fields that are set."""
+        entry = ConsoleLogEntry('warn', 'javascript', 'oops', 5, context_id='ctx')
+        assert entry.to_dict() == {
+            'level': 'warn', 'source': 'javascript', 'text': 'oops',
+            'timestamp': 5, 'context_id': 'ctx',
+        }
+
+    def test_from_bidi_event_with_source_dict(self):
+        """Source type and context should both come from the source dict."""
+        entry = ConsoleLogEntry.from_bidi_event({
+            'method': 'log.entryAdded',
+            'params': {
+                'level': 'error', 'text': 'boom', 'timestamp': 10,
+                'source': {'type': 'javascript', 'context': 'ctx-1'},
+                'stackTrace': {'callFrames': []}, 'args': [1], 'method': 'error',
+            },
+        })
+        assert (entry.level, entry.source, entry.text, entry.timestamp) == ('error', 'javascript', 'boom', 10)
+        assert entry.context_id == 'ctx-1'
+        assert entry.stack_trace == {'callFrames': []}
+        assert entry.args == [1]
+        assert entry.method == 'error'
+
+    def test_from_bidi_event_defaults(self):
+        """Missing fields should fall back to the documented defaults."""
+        entry = ConsoleLogEntry.from_bidi_event({'params': {'source': 'console'}})
+        assert (entry.level, entry.source, entry.text, entry.timestamp) == ('info', 'console', '', 0)
+        assert entry.context_id is None
+        assert entry.args == []
+
+        entry = ConsoleLogEntry.from_bidi_event({})
+        assert entry.source == 'console'
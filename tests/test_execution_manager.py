@@ -0,0 +1,1108 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for FirefoxExecutionManager internals.
+
+These tests do not require a running Firefox instance (uses mocking
+of the WebSocket connection where needed).
+"""
+
+import collections
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+
+import pytest
+from unittest import mock
+
+from FirefoxController import execution_manager
+from FirefoxController.execution_manager import (
+    FirefoxExecutionManager,
+    _encode_message,
+    _decode_message,
+    _message_template,
+    _temp_profile_root,
+)
+from FirefoxController.exceptions import (
+    FirefoxError,
+    FirefoxResponseNotReceived,
+    FirefoxStartupException,
+    FirefoxTabNotFoundError,
+)
+
+
+class FakeWebSocket:
+    """
+    Minimal stand-in for a websockets sync connection.
+
+    respond(message) is called for every sent message and returns the list
+    of frames (dicts) to make available to recv(). Frames can also be queued
+    directly with push().
+    """
+
+    def __init__(self, respond=None):
+        self.respond = respond or (lambda message: [{"id": message["id"], "type": "success", "result": {}}])
+        self.frames = queue.Queue()
+        self.sent = []
+
+    def send(self, data):
+        message = json.loads(data)
+        self.sent.append(message)
+        for frame in self.respond(message):
+            self.push(frame)
+
+    def push(self, frame):
+        self.frames.put(json.dumps(frame))
+
+    def recv(self, timeout=None):
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError()
+
+
+def make_manager(ws):
+    """Create a manager wired to a fake WebSocket, without starting Firefox."""
+    mgr = FirefoxExecutionManager(port=9222)
+    mgr.ws_connection = ws
+    return mgr
+
+
+# ---------------------------------------------------------------------------
+# WebSocket message (de)serialization
+# ---------------------------------------------------------------------------
+
+class TestMessageSerialization:
+    """Test _encode_message/_decode_message with and without orjson."""
+
+    @pytest.fixture(params=[True, False], ids=["orjson", "json"])
+    def backend(self, request):
+        """Run each test with orjson enabled (if installed) and disabled."""
+        if request.param and not execution_manager.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+        with mock.patch.object(execution_manager, 'ORJSON_AVAILABLE', request.param):
+            yield request.param
+
+    def test_round_trip(self, backend):
+        """A typical command should survive encode/decode unchanged."""
+        message = {"id": 7, "method": "script.evaluate",
+                   "params": {"expression": "1 + 1", "awaitPromise": True, "target": {"context": "cé"}}}
+        encoded = _encode_message(message)
+        assert isinstance(encoded, str)
+        assert _decode_message(encoded) == message
+        assert json.loads(encoded) == message
+
+    def test_non_string_keys(self, backend):
+        """Integer keys should be stringified like json.dumps does."""
+        assert json.loads(_encode_message({1: "a"})) == {"1": "a"}
+
+    def test_wide_integer_falls_back(self, backend):
+        """Integers wider than 64 bits should still serialize."""
+        value = 1 << 70
+        assert json.loads(_encode_message({"n": value})) == {"n": value}
+
+    def test_decode_bytes(self, backend):
+        """Frames delivered as bytes should decode."""
+        assert _decode_message(b'{"type": "event"}') == {"type": "event"}
+
+    def test_decode_nan_literal(self, backend):
+        """NaN literals accepted by json should not be rejected."""
+        result = _decode_message('{"v": NaN}')
+        assert result["v"] != result["v"]
+
+    def test_decode_invalid(self, backend):
+        """Malformed frames should raise ValueError."""
+        with pytest.raises(ValueError):
+            _decode_message('{"type": ')
+
+    def test_template_formats_id(self, backend):
+        """A pre-encoded template should decode to the full message."""
+        template = _message_template("script.evaluate", {"expression": "10 % 3", "awaitPromise": False})
+        assert json.loads(template % 12) == {
+            "id": 12, "method": "script.evaluate",
+            "params": {"expression": "10 % 3", "awaitPromise": False}}
+
+
+# ---------------------------------------------------------------------------
+# Command/response dispatch
+# ---------------------------------------------------------------------------
+
+class TestSendMessage:
+    """Test _send_message's response matching and hand-off between threads."""
+
+    def test_returns_matching_response(self):
+        """The response with the sent message's ID should be returned."""
+        mgr = make_manager(FakeWebSocket())
+        response = mgr._send_message({"method": "session.status", "params": {}})
+        assert response["id"] == mgr.ws_connection.sent[0]["id"]
+        assert mgr._pending_responses == {}
+
+    def test_template_gets_fresh_id(self):
+        """Templates sent twice should go out with distinct message IDs."""
+        ws = FakeWebSocket()
+        mgr = make_manager(ws)
+        template = _message_template("browsingContext.create", {"type": "tab"})
+        mgr._send_message(template)
+        mgr._send_message(template)
+        assert [m["id"] for m in ws.sent] == [1, 2]
+        assert ws.sent[0]["params"] == {"type": "tab"}
+
+    def test_payloads_not_formatted_without_debug_logging(self):
+        """Message bodies should not be formatted for a disabled debug log."""
+        mgr = make_manager(FakeWebSocket())
+        mgr.log = mock.Mock()
+        mgr.log.isEnabledFor.return_value = False
+        mgr._send_message({"method": "session.status", "params": {}})
+        mgr.log.debug.assert_not_called()
+
+    def test_error_response_raises(self):
+        """Error responses should raise FirefoxError."""
+        ws = FakeWebSocket(lambda m: [{"id": m["id"], "type": "error", "error": "unknown command",
+                                       "message": "nope"}])
+        mgr = make_manager(ws)
+        with pytest.raises(FirefoxError, match="nope"):
+            mgr._send_message({"method": "bogus", "params": {}})
+
+    def test_timeout_raises_and_cleans_up(self):
+        """A missing response should time out and leave nothing pending."""
+        mgr = make_manager(FakeWebSocket(lambda m: []))
+        with pytest.raises(FirefoxResponseNotReceived):
+            mgr._send_message({"method": "session.status", "params": {}}, timeout=0.05)
+        assert mgr._pending_responses == {}
+
+    def test_events_are_routed_while_waiting(self):
+        """Events read while waiting for a response should reach the per-tab queues."""
+        def respond(message):
+            return [
+                {"type": "event", "method": "browsingContext.load", "params": {"context": "ctx-1"}},
+                {"type": "event", "method": "log.entryAdded",
+                 "params": {"level": "info", "source": {"context": "ctx-1"}}},
+                {"id": message["id"], "type": "success", "result": {}},
+            ]
+        mgr = make_manager(FakeWebSocket(respond))
+        mgr._send_message({"method": "session.status", "params": {}})
+        assert mgr.get_event_queue_for_context("ctx-1").get_nowait()["method"] == "browsingContext.load"
+        assert mgr.get_console_queue_for_context("ctx-1").get_nowait()["method"] == "log.entryAdded"
+
+    def test_concurrent_commands_get_their_own_responses(self):
+        """Responses arriving out of order should reach the right threads."""
+        both_sent = threading.Barrier(2)
+        ws = FakeWebSocket(lambda m: [])
+        mgr = make_manager(ws)
+        results = {}
+
+        def worker(name):
+            both_sent.wait()
+            results[name] = mgr._send_message({"method": name, "params": {}}, timeout=5)
+
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ("first", "second")]
+        for thread in threads:
+            thread.start()
+        while len(ws.sent) < 2:
+            time.sleep(0.01)
+        # Answer in reverse order
+        for message in reversed(list(ws.sent)):
+            ws.push({"id": message["id"], "type": "success", "result": {"method": message["method"]}})
+        for thread in threads:
+            thread.join(5)
+
+        assert results["first"]["result"]["method"] == "first"
+        assert results["second"]["result"]["method"] == "second"
+        assert mgr._pending_responses == {}
+
+    def test_batch_is_sent_before_waiting(self):
+        """_send_messages should write every command before the first response."""
+        ws = FakeWebSocket(lambda m: [])
+        mgr = make_manager(ws)
+        result = {}
+
+        def worker():
+            result["responses"] = mgr._send_messages(
+                [{"method": "browsingContext.close", "params": {"context": ctx}} for ctx in ("a", "b", "c")],
+                timeout=5)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        while len(ws.sent) < 3:
+            time.sleep(0.01)
+        for message in reversed(list(ws.sent)):
+            ws.push({"id": message["id"], "type": "success", "result": {"closed": message["params"]["context"]}})
+        thread.join(5)
+
+        assert [r["result"]["closed"] for r in result["responses"]] == ["a", "b", "c"]
+        assert mgr._pending_responses == {}
+
+    def test_batch_error_raises_and_cleans_up(self):
+        """An error response to one command in a batch should raise and leave nothing pending."""
+        def respond(message):
+            if message["params"]["context"] == "bad":
+                return [{"id": message["id"], "type": "error", "error": "no such frame", "message": "gone"}]
+            return [{"id": message["id"], "type": "success", "result": {}}]
+        mgr = make_manager(FakeWebSocket(respond))
+        with pytest.raises(FirefoxError, match="gone"):
+            mgr._send_messages([{"method": "browsingContext.close", "params": {"context": ctx}}
+                                for ctx in ("ok", "bad", "ok")])
+        assert mgr._pending_responses == {}
+
+    def test_close_all_tabs_pipelines_closes(self):
+        """close_all_tabs should send every close before waiting and stop tracking the tabs."""
+        ws = FakeWebSocket()
+        mgr = make_manager(ws)
+        for ctx in ("t1", "t2", "t3"):
+            mgr.tabs[ctx] = object()
+            mgr.tab_id_map[ctx] = {"context_id": ctx}
+        mgr.browsing_context = "t2"
+
+        with mock.patch.object(mgr, '_wait_for_response', wraps=mgr._wait_for_response) as wait:
+            assert mgr.close_all_tabs() is True
+            assert wait.call_count == 3
+
+        assert [m["params"]["context"] for m in ws.sent] == ["t1", "t2", "t3"]
+        assert mgr.tabs == {} and mgr.tab_id_map == {}
+        assert mgr.browsing_context is None
+
+    def test_close_tabs_reports_failed_close(self):
+        """close_tabs should return False when Firefox refuses to close a tab."""
+        ws = FakeWebSocket(lambda m: [{"id": m["id"], "type": "error", "error": "no such frame",
+                                       "message": "gone"} if m["params"]["context"] == "t2" else
+                                      {"id": m["id"], "type": "success", "result": {}}])
+        mgr = make_manager(ws)
+        for ctx in ("t1", "t2", "t3"):
+            mgr.tabs[ctx] = object()
+            mgr.tab_id_map[ctx] = {"context_id": ctx}
+
+        assert mgr.close_tabs(["t1", "t2"]) is False
+        assert sorted(mgr.tabs) == ["t3"]
+
+    def test_poll_hands_off_pending_response(self):
+        """poll_for_events should file command responses for their waiters."""
+        ws = FakeWebSocket()
+        mgr = make_manager(ws)
+        mgr._pending_responses[42] = None
+        ws.push({"id": 42, "type": "success", "result": {}})
+        ws.push({"type": "event", "method": "network.responseCompleted", "params": {"context": "ctx-2"}})
+
+        assert mgr.poll_for_events(timeout=0.01) == 1
+        assert mgr._pending_responses[42]["id"] == 42
+        assert not mgr.ws_lock.locked()
+
+    def test_poll_does_not_wait_out_another_reader(self):
+        """poll_for_events should give up after its own timeout while another thread reads."""
+        ws = FakeWebSocket()
+        mgr = make_manager(ws)
+        ws.push({"type": "event", "method": "network.responseCompleted", "params": {"context": "ctx-2"}})
+        mgr.ws_lock.acquire()
+        try:
+            start = time.monotonic()
+            assert mgr.poll_for_events(timeout=0.05) == 0
+            assert time.monotonic() - start < 1
+        finally:
+            mgr._release_reader()
+        assert not ws.frames.empty()
+
+    def test_poll_drains_buffered_burst(self):
+        """All frames already buffered should be drained in one poll."""
+        ws = FakeWebSocket()
+        mgr = make_manager(ws)
+        for _ in range(25):
+            ws.push({"type": "event", "method": "network.responseCompleted", "params": {"context": "ctx-3"}})
+
+        assert mgr.poll_for_events(timeout=0.01) == 25
+        assert ws.frames.empty()
+
+    def test_poll_is_bounded_under_event_flood(self):
+        """A never-ending event stream should not keep poll_for_events running."""
+        event = json.dumps({"type": "event", "method": "network.beforeRequestSent", "params": {"context": "ctx-4"}})
+        mgr = make_manager(mock.Mock())
+        mgr.ws_connection.recv.return_value = event
+        mgr.POLL_MAX_FRAMES = 50
+
+        assert mgr.poll_for_events(timeout=0.01) == 50
+        assert mgr.ws_connection.recv.call_count == 50
+
+
+# ---------------------------------------------------------------------------
+# Event waiters
+# ---------------------------------------------------------------------------
+
+class TestReceiveEvent:
+    """Test _receive_event sharing the reader role with other threads."""
+
+    LOAD = {"type": "event", "method": "browsingContext.load",
+            "params": {"context": "ctx-1", "url": "about:blank"}}
+
+    def test_returns_matching_event_and_routes_others(self):
+        """Non-matching frames read while waiting should be routed, not dropped."""
+        ws = FakeWebSocket()
+        mgr = make_manager(ws)
+        ws.push({"type": "event", "method": "browsingContext.load", "params": {"context": "ctx-2"}})
+        ws.push(self.LOAD)
+
+        event = mgr._receive_event("browsingContext.load", {"context": "ctx-1"}, timeout=1)
+        assert event["params"]["context"] == "ctx-1"
+        assert mgr.get_event_queue_for_context("ctx-2").get_nowait()["method"] == "browsingContext.load"
+        assert mgr._event_waiters == {}
+        assert not mgr.ws_lock.locked()
+
+    def test_timeout_returns_none(self):
+        """No matching event within the timeout should return None."""
+        mgr = make_manager(FakeWebSocket())
+        assert mgr._receive_event("browsingContext.load", {}, timeout=0.05) is None
+        assert mgr._event_waiters == {}
+
+    def test_response_read_while_waiting_is_handed_off(self):
+        """A command response read by an event waiter should reach its sender."""
+        ws = FakeWebSocket()
+        mgr = make_manager(ws)
+        mgr._pending_responses[7] = None
+        ws.push({"id": 7, "type": "success", "result": {}})
+        ws.push(self.LOAD)
+
+        assert mgr._receive_event("browsingContext.load", {}, timeout=1) is not None
+        assert mgr._pending_responses[7]["id"] == 7
+
+    def test_waiters_only_see_their_event_type(self):
+        """Events of other types should be routed even while waiters are registered."""
+        ws = FakeWebSocket()
+        mgr = make_manager(ws)
+        ws.push({"type": "event", "method": "network.responseCompleted", "params": {"context": "ctx-1"}})
+        ws.push(self.LOAD)
+
+        assert mgr._receive_event("browsingContext.load", {}, timeout=1) is not None
+        assert mgr.get_event_queue_for_context("ctx-1").get_nowait()["method"] == "network.responseCompleted"
+        assert mgr._event_waiters == {}
+
+    def test_navigate_waits_on_event_without_sleeping(self):
+        """navigate should return as soon as its domContentLoaded event arrives."""
+        def respond(message):
+            return [
+                {"id": message["id"], "type": "success", "result": {"navigation": "nav-1"}},
+                {"type": "event", "method": "browsingContext.domContentLoaded",
+                 "params": {"context": "ctx-1", "navigation": "nav-1", "url": "https://example.com/"}},
+            ]
+        mgr = make_manager(FakeWebSocket(respond))
+        mgr.browsing_context = "ctx-1"
+
+        with mock.patch('time.sleep') as sleep:
+            result = mgr.navigate("https://example.com/", timeout=5)
+        assert result["navigation"] == "nav-1"
+        sleep.assert_not_called()
+        assert mgr.ws_connection.frames.empty()
+
+    def test_event_read_by_command_is_handed_off(self):
+        """An awaited event read by a thread sending a command should reach the waiter."""
+        ws = FakeWebSocket(lambda m: [self.LOAD, {"id": m["id"], "type": "success", "result": {}}])
+        mgr = make_manager(ws)
+        result = {}
+        waiter_thread = threading.Thread(
+            target=lambda: result.update(event=mgr._receive_event("browsingContext.load",
+                                                                  {"context": "ctx-1"}, timeout=5)))
+        waiter_thread.start()
+        while not mgr._event_waiters:
+            time.sleep(0.01)
+
+        mgr._send_message({"method": "browsingContext.navigate", "params": {}}, timeout=5)
+        waiter_thread.join(5)
+        assert result["event"]["params"]["url"] == "about:blank"
+        assert mgr.get_event_queue_for_context("ctx-1").empty()
+
+
+
+# ---------------------------------------------------------------------------
+# Per-tab event queues
+# ---------------------------------------------------------------------------
+
+class TestEventQueues:
+    """Test get_event_queue_for_context/get_console_queue_for_context."""
+
+    def test_same_queue_per_context(self):
+        """Each context should get one queue, reused on later lookups."""
+        mgr = make_manager(None)
+        event_queue = mgr.get_event_queue_for_context("ctx-1")
+        assert mgr.get_event_queue_for_context("ctx-1") is event_queue
+        assert mgr.get_event_queue_for_context("ctx-2") is not event_queue
+        assert mgr.get_console_queue_for_context("ctx-1") is not event_queue
+
+    def test_concurrent_creation_yields_one_queue(self):
+        """Threads racing to create a context's queue should all get the same one."""
+        mgr = make_manager(None)
+        start = threading.Barrier(8)
+        seen = []
+
+        def worker():
+            start.wait()
+            seen.append(mgr.get_console_queue_for_context("ctx-race"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        assert len(seen) == 8
+        assert all(q is seen[0] for q in seen)
+
+    def test_empty_queue_raises_empty(self):
+        """Consumers rely on get_nowait() raising queue.Empty when drained."""
+        mgr = make_manager(None)
+        event_queue = mgr.get_event_queue_for_context("ctx-1")
+        event_queue.put({"method": "browsingContext.load"})
+        assert event_queue.get_nowait() == {"method": "browsingContext.load"}
+        with pytest.raises(queue.Empty):
+            event_queue.get_nowait()
+
+    def test_full_queue_drops_oldest(self):
+        """A tab whose events aren't consumed should keep only the newest ones."""
+        mgr = make_manager(None)
+        mgr.EVENT_QUEUE_MAX_SIZE = 3
+        mgr.log = mock.Mock()
+        for n in range(5):
+            mgr._route_event({"type": "event", "method": "browsingContext.load",
+                              "params": {"context": "ctx-1", "n": n}})
+
+        event_queue = mgr.get_event_queue_for_context("ctx-1")
+        assert event_queue.qsize() == 3 and event_queue.dropped == 2
+        assert [event_queue.get_nowait()["params"]["n"] for _ in range(3)] == [2, 3, 4]
+        assert mgr.log.warning.call_count == 1
+
+    def test_blocking_get_waits_for_put(self):
+        """get() should block until another thread queues an event, or time out."""
+        event_queue = make_manager(None).get_console_queue_for_context("ctx-1")
+        with pytest.raises(queue.Empty):
+            event_queue.get(timeout=0.01)
+
+        timer = threading.Timer(0.05, event_queue.put, args=({"method": "log.entryAdded"},))
+        timer.start()
+        assert event_queue.get(timeout=5) == {"method": "log.entryAdded"}
+        timer.join()
+
+
+
+class TestInterfaceQueueDraining:
+    """Test that the interface drains its per-tab queues past bad events."""
+
+    def _interface(self):
+        """An interface for context ctx-1 on a manager with a fake WebSocket."""
+        from FirefoxController.interface import FirefoxRemoteDebugInterface
+        mgr = make_manager(FakeWebSocket())
+        iface = FirefoxRemoteDebugInterface(manager=mgr)
+        iface.active_browsing_context = "ctx-1"
+        return mgr, iface
+
+    def test_bad_console_event_does_not_stop_draining(self):
+        """A console event that fails to parse should be skipped, not end the drain."""
+        mgr, iface = self._interface()
+        iface._console_logging_enabled = True
+        console_queue = mgr.get_console_queue_for_context("ctx-1")
+        for text in ("bad", "good"):
+            console_queue.put({"type": "event", "method": "log.entryAdded",
+                               "params": {"level": "info", "text": text, "source": {"context": "ctx-1"}}})
+
+        from FirefoxController.bidi_types import ConsoleLogEntry
+        real_parse = ConsoleLogEntry.from_bidi_event
+
+        def parse(event):
+            if event["params"]["text"] == "bad":
+                raise ValueError("malformed")
+            return real_parse(event)
+
+        with mock.patch('FirefoxController.interface.ConsoleLogEntry.from_bidi_event', side_effect=parse):
+            assert iface._process_console_events() == 1
+        assert console_queue.empty()
+        assert [m.text for m in iface._console_messages] == ["good"]
+
+    def test_bad_network_event_does_not_stop_draining(self):
+        """A response event that fails to handle should be skipped, not end the drain."""
+        mgr, iface = self._interface()
+        iface._request_logging_enabled = True
+        event_queue = mgr.get_event_queue_for_context("ctx-1")
+        for _ in range(2):
+            event_queue.put({"type": "event", "method": "network.responseCompleted", "params": {}})
+
+        with mock.patch.object(iface, '_handle_response_completed_event',
+                               side_effect=[ValueError("malformed"), None]):
+            assert iface.process_events() == 1
+        assert event_queue.empty()
+
+
+# ---------------------------------------------------------------------------
+# Tab lookup
+# ---------------------------------------------------------------------------
+
+class TestGetTab:
+    """Test get_tab's lookup and refresh, and the URL index."""
+
+    def test_known_tab_needs_no_refresh(self):
+        """A tracked tab should be returned without asking Firefox."""
+        mgr = make_manager(FakeWebSocket())
+        mgr.tab_id_map["ctx-1"] = {"actor": "ctx-1", "url": "about:blank"}
+        with mock.patch.object(mgr, '_list_browsing_contexts') as refresh:
+            assert mgr.get_tab("ctx-1")["url"] == "about:blank"
+        refresh.assert_not_called()
+
+    def test_unknown_tab_refreshes_once(self):
+        """An untracked tab should be looked up again after refreshing the tab list."""
+        mgr = make_manager(FakeWebSocket())
+
+        def refresh():
+            mgr.tab_id_map["ctx-2"] = {"actor": "ctx-2", "url": "https://example.com/"}
+
+        with mock.patch.object(mgr, '_list_browsing_contexts', side_effect=refresh):
+            assert mgr.get_tab("ctx-2")["url"] == "https://example.com/"
+
+    def test_refresh_reuses_existing_interfaces(self):
+        """Listing tabs again should keep interfaces of surviving tabs and drop closed ones."""
+        tree = {"contexts": [{"context": "t1", "url": "about:blank"}, {"context": "t2", "url": "about:blank"}]}
+        ws = FakeWebSocket(lambda m: [{"id": m["id"], "type": "success", "result": tree}])
+        mgr = make_manager(ws)
+        mgr._list_browsing_contexts()
+        first = mgr.tabs["t1"]
+
+        tree = {"contexts": [{"context": "t1", "url": "about:blank"}, {"context": "t3", "url": "about:blank"}]}
+        with mock.patch.object(mgr, '_create_interface_for_context',
+                               wraps=mgr._create_interface_for_context) as create:
+            mgr._list_browsing_contexts()
+
+        assert mgr.tabs["t1"] is first
+        assert sorted(mgr.tabs) == ["t1", "t3"]
+        create.assert_called_once_with("t3")
+
+    def test_new_tab_listed_with_actor_and_type(self):
+        """Tabs opened with new_tab() should carry the listing keys, before and after a refresh."""
+        def respond(message):
+            if message["method"] == "browsingContext.create":
+                result = {"context": "t9"}
+            else:
+                result = {"contexts": [{"context": "t1", "url": "about:blank"},
+                                       {"context": "t9", "url": "about:blank", "title": "New Tab"}]}
+            return [{"id": message["id"], "type": "success", "result": result}]
+
+        mgr = make_manager(FakeWebSocket(respond))
+        mgr.new_tab()
+        assert [tab["actor"] for tab in mgr.list_tabs()] == ["t9"]
+
+        # An entry recorded without the listing keys should get them on refresh
+        del mgr.tab_id_map["t9"]["actor"]
+        mgr._list_browsing_contexts()
+        tabs = {tab["actor"]: tab for tab in mgr.list_tabs()}
+
+        assert sorted(tabs) == ["t1", "t9"]
+        assert tabs["t9"]["type"] == "tab"
+        assert tabs["t9"]["title"] == "New Tab"
+
+    def test_unchanged_refresh_keeps_tab_state(self):
+        """An identical getTree result should not rebuild the tab maps, unless they changed since."""
+        tree = {"contexts": [{"context": "t1", "url": "about:blank"}, {"context": "t2", "url": "about:blank"}]}
+        ws = FakeWebSocket(lambda m: [{"id": m["id"], "type": "success", "result": tree}])
+        mgr = make_manager(ws)
+        mgr._list_browsing_contexts()
+        mgr.tab_id_map["t1"]["title"] = "not from Firefox"
+
+        assert len(mgr._list_browsing_contexts()) == 2
+        assert mgr.tab_id_map["t1"]["title"] == "not from Firefox"
+
+        mgr.close_tab("t2")
+        assert len(mgr._list_browsing_contexts()) == 2
+        assert mgr.tab_id_map["t1"]["title"] == ""
+        assert sorted(mgr.tab_id_map) == ["t1", "t2"]
+
+    def test_refresh_updates_tab_info_in_place(self):
+        """A refresh should update surviving tabs' info dicts and the URL index in place."""
+        tree = {"contexts": [{"context": "t1", "url": "about:blank"}, {"context": "t2", "url": "about:blank"}]}
+        ws = FakeWebSocket(lambda m: [{"id": m["id"], "type": "success", "result": tree}])
+        mgr = make_manager(ws)
+        mgr._list_browsing_contexts()
+        info = mgr.tab_id_map["t1"]
+
+        tree = {"contexts": [{"context": "t1", "url": "https://a.example/", "title": "A"}]}
+        mgr._list_browsing_contexts()
+
+        assert mgr.tab_id_map["t1"] is info
+        assert info["url"] == "https://a.example/" and info["title"] == "A"
+        assert sorted(mgr.tabs) == ["t1"] and sorted(mgr.tab_id_map) == ["t1"]
+        assert mgr.find_tabs_by_url("https://a.example/") == [info]
+        assert mgr.find_tabs_by_url("about:blank") == []
+
+    def test_find_tabs_by_url(self):
+        """Tabs should be found by URL, and forgotten when closed."""
+        mgr = make_manager(FakeWebSocket())
+        for ctx, url in (("t1", "https://a.example/"), ("t2", "https://b.example/"), ("t3", "https://a.example/")):
+            mgr.tabs[ctx] = object()
+            mgr._track_tab(ctx, {"context_id": ctx, "url": url})
+
+        assert sorted(t["context_id"] for t in mgr.find_tabs_by_url("https://a.example/")) == ["t1", "t3"]
+        assert mgr.find_tabs_by_url("https://c.example/") == []
+
+        mgr.close_tab("t1")
+        assert [t["context_id"] for t in mgr.find_tabs_by_url("https://a.example/")] == ["t3"]
+        mgr.close_tab("t3")
+        assert mgr.find_tabs_by_url("https://a.example/") == []
+        assert "https://a.example/" not in mgr._url_to_tabs
+
+    def test_retracking_tab_moves_url(self):
+        """Recording new info for a tab should drop its old URL from the index."""
+        mgr = make_manager(FakeWebSocket())
+        mgr._track_tab("t1", {"url": "https://a.example/"})
+        mgr._track_tab("t1", {"url": "https://b.example/"})
+        assert mgr.find_tabs_by_url("https://a.example/") == []
+        assert mgr.find_tabs_by_url("https://b.example/") == [{"url": "https://b.example/"}]
+
+    def test_missing_tab_raises(self):
+        """A tab Firefox doesn't know about should raise FirefoxTabNotFoundError."""
+        mgr = make_manager(FakeWebSocket())
+        with mock.patch.object(mgr, '_list_browsing_contexts') as refresh:
+            with pytest.raises(FirefoxTabNotFoundError):
+                mgr.get_tab("ctx-missing")
+        refresh.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Temporary profiles
+# ---------------------------------------------------------------------------
+
+class TestTemporaryProfile:
+    """Test the temporary_profile option and its placement."""
+
+    @staticmethod
+    def _statvfs(free_bytes):
+        """Fake os.statvfs result with the given free space."""
+        return mock.Mock(f_bavail=free_bytes // 4096, f_frsize=4096)
+
+    def test_default_profile_is_persistent(self):
+        """Without options the persistent home-directory profile is used."""
+        mgr = FirefoxExecutionManager(port=9222)
+        assert mgr.profile_dir == os.path.expanduser("~/.firefox_controller_profile")
+        assert not mgr.temporary_profile
+
+    def test_explicit_profile_dir_wins(self, tmp_path):
+        """temporary_profile should be ignored when profile_dir is given."""
+        mgr = FirefoxExecutionManager(port=9222, profile_dir=str(tmp_path), temporary_profile=True)
+        assert mgr.profile_dir == str(tmp_path)
+        assert not mgr.temporary_profile
+
+    def test_root_prefers_roomy_tmpfs(self, tmp_path):
+        """A RAM-backed directory with enough free space should be chosen."""
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': str(tmp_path)}), \
+                mock.patch.object(execution_manager, 'IS_LINUX', False), \
+                mock.patch('os.statvfs', return_value=self._statvfs(1 << 40)):
+            assert _temp_profile_root() == str(tmp_path)
+
+    def test_root_skips_small_tmpfs(self, tmp_path):
+        """A nearly full RAM-backed directory should fall back to the default."""
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': str(tmp_path)}), \
+                mock.patch.object(execution_manager, 'IS_LINUX', False), \
+                mock.patch('os.statvfs', return_value=self._statvfs(64 * 1024 * 1024)):
+            assert _temp_profile_root() is None
+
+    def test_temporary_profile_created_and_removed(self, tmp_path):
+        """_create_profile should make a fresh profile that close() deletes."""
+        mgr = FirefoxExecutionManager(port=9222, temporary_profile=True)
+        mgr.ws_connection = None
+        assert mgr.profile_dir is None
+
+        with mock.patch.object(execution_manager, '_temp_profile_root', return_value=str(tmp_path)), \
+                mock.patch.object(mgr, '_install_ublock_origin'):
+            profile_path = mgr._create_profile()
+
+        assert os.path.dirname(profile_path) == str(tmp_path)
+        assert mgr.temp_profile == profile_path
+        assert os.path.isfile(os.path.join(profile_path, "prefs.js"))
+
+        mgr.close()
+        assert not os.path.exists(profile_path)
+        assert mgr.temp_profile is None
+
+    def test_background_removal(self, tmp_path):
+        """The tree should vanish from its path at once and be deleted by the worker."""
+        profile = tmp_path / "profile"
+        (profile / "cache2" / "entries").mkdir(parents=True)
+        (profile / "cache2" / "entries" / "abc").write_bytes(b"x" * 100)
+
+        thread = execution_manager._remove_tree_in_background(str(profile))
+        assert not profile.exists()
+        thread.join(10)
+        assert os.listdir(str(tmp_path)) == []
+
+    def test_prefs_written_for_new_profile(self, tmp_path):
+        """A new profile's prefs.js should carry the debugging port."""
+        mgr = FirefoxExecutionManager(port=9345, profile_dir=str(tmp_path))
+        with mock.patch.object(mgr, '_install_ublock_origin'):
+            mgr._create_profile()
+
+        with open(os.path.join(str(tmp_path), "prefs.js")) as f:
+            assert 'user_pref("devtools.debugger.remote-port", 9345);' in f.read()
+
+    def test_existing_prefs_preserved(self, tmp_path):
+        """An existing prefs.js should not be overwritten."""
+        prefs_file = tmp_path / "prefs.js"
+        prefs_file.write_text('user_pref("custom.pref", 1);\n')
+        mgr = FirefoxExecutionManager(port=9345, profile_dir=str(tmp_path))
+        with mock.patch.object(mgr, '_install_ublock_origin'):
+            mgr._create_profile()
+
+        contents = prefs_file.read_text()
+        assert 'user_pref("custom.pref", 1);' in contents
+        assert "remote-port" not in contents
+
+    def test_cookie_prefs_only_appended_when_wrong(self, tmp_path):
+        """Only missing prefs, or prefs whose last value is wrong, should be appended."""
+        prefs_file = tmp_path / "prefs.js"
+        prefs_file.write_text(
+            'user_pref("privacy.clearOnShutdown.cookies", false);\n'
+            'user_pref("privacy.clearOnShutdown.cache", false);\n'
+            'user_pref("privacy.clearOnShutdown.cache", true);\n'
+        )
+        mgr = FirefoxExecutionManager(port=9345, profile_dir=str(tmp_path))
+        mgr._ensure_cookie_persistence(str(tmp_path))
+
+        added = prefs_file.read_text().split("(added by FirefoxController)\n", 1)[1]
+        assert 'user_pref("privacy.clearOnShutdown.cache", false);' in added
+        assert "clearOnShutdown.cookies" not in added
+        assert 'user_pref("privacy.clearOnShutdown_v2.sessions", false);' in added
+
+        # A second pass should find everything in place
+        before = prefs_file.read_text()
+        mgr._ensure_cookie_persistence(str(tmp_path))
+        assert prefs_file.read_text() == before
+
+
+
+# ---------------------------------------------------------------------------
+# uBlock Origin download cache
+# ---------------------------------------------------------------------------
+
+class FakeHTTPResponse:
+    """Context-manager response with a body and headers, like urlopen's."""
+
+    def __init__(self, body, etag=None):
+        self.body = body
+        self.headers = {'ETag': etag} if etag else {}
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self.body)
+        chunk, self.body = self.body[:size], self.body[size:]
+        return chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class TestUBlockCache:
+    """Test that the uBlock XPI is cached and revalidated across profiles."""
+
+    XPI_NAME = "uBlock0@raymondhill.net.xpi"
+
+    @pytest.fixture
+    def env(self, tmp_path):
+        """Point the user cache at a temp dir and return (manager, cache_dir)."""
+        cache_root = tmp_path / "cache"
+        with mock.patch.dict(os.environ, {'XDG_CACHE_HOME': str(cache_root), 'LOCALAPPDATA': str(cache_root)}):
+            yield FirefoxExecutionManager(port=9222), execution_manager._user_cache_dir()
+
+    def _installed(self, profile):
+        """Contents of the XPI installed into a profile, or None."""
+        path = os.path.join(str(profile), "extensions", self.XPI_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_first_install_populates_cache(self, env, tmp_path):
+        """A fresh download should land in both the cache and the profile."""
+        mgr, cache_dir = env
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(b"xpi-v1", etag='"v1"')):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+
+        assert self._installed(tmp_path / "p1") == b"xpi-v1"
+        with open(os.path.join(cache_dir, self.XPI_NAME + ".etag")) as f:
+            assert f.read() == '"v1"'
+        assert [name for name in os.listdir(cache_dir) if name.endswith(".part")] == []
+
+    def test_not_modified_uses_cache(self, env, tmp_path):
+        """A 304 should install the cached copy and send the stored ETag."""
+        mgr, cache_dir = env
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(b"xpi-v1", etag='"v1"')):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+
+        not_modified = urllib.error.HTTPError("url", 304, "Not Modified", {}, None)
+        with mock.patch('urllib.request.urlopen', side_effect=not_modified) as urlopen:
+            mgr._install_ublock_origin(str(tmp_path / "p2"))
+
+        request = urlopen.call_args[0][0]
+        assert request.get_header('If-none-match') == '"v1"'
+        assert request.get_header('If-modified-since')
+        assert self._installed(tmp_path / "p2") == b"xpi-v1"
+
+    def test_modified_replaces_cache(self, env, tmp_path):
+        """A new version should replace the cached XPI and ETag."""
+        mgr, cache_dir = env
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(b"xpi-v1", etag='"v1"')):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(b"xpi-v2", etag='"v2"')):
+            mgr._install_ublock_origin(str(tmp_path / "p2"))
+
+        assert self._installed(tmp_path / "p1") == b"xpi-v1"
+        assert self._installed(tmp_path / "p2") == b"xpi-v2"
+        with open(os.path.join(cache_dir, self.XPI_NAME)) as f:
+            assert f.read() == "xpi-v2"
+
+    def test_download_is_streamed(self, env, tmp_path):
+        """A body larger than the chunk size should be written intact."""
+        mgr, cache_dir = env
+        mgr.DOWNLOAD_CHUNK_SIZE = 7
+        body = bytes(range(256)) * 4
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(body)):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+
+        assert self._installed(tmp_path / "p1") == body
+
+    def test_interrupted_download_keeps_cache(self, env, tmp_path):
+        """A connection dropped mid-body should leave the cached XPI untouched."""
+        mgr, cache_dir = env
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(b"xpi-v1")):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+
+        broken = FakeHTTPResponse(b"xpi-v2")
+        broken.read = mock.Mock(side_effect=[b"xpi", ConnectionResetError("reset")])
+        with mock.patch('urllib.request.urlopen', return_value=broken):
+            mgr._install_ublock_origin(str(tmp_path / "p2"))
+
+        assert self._installed(tmp_path / "p2") == b"xpi-v1"
+        assert [name for name in os.listdir(cache_dir) if name.endswith(".part")] == []
+
+    def test_network_failure_falls_back_to_cache(self, env, tmp_path):
+        """If revalidation fails, the cached copy should still be installed."""
+        mgr, cache_dir = env
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(b"xpi-v1")):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+        with mock.patch('urllib.request.urlopen', side_effect=urllib.error.URLError("offline")):
+            mgr._install_ublock_origin(str(tmp_path / "p2"))
+
+        assert self._installed(tmp_path / "p2") == b"xpi-v1"
+
+    def test_cache_is_hard_linked(self, env, tmp_path):
+        """On the same filesystem the profile copy should share the cache inode."""
+        mgr, cache_dir = env
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(b"xpi-v1")):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+
+        installed = os.path.join(str(tmp_path / "p1"), "extensions", self.XPI_NAME)
+        assert os.path.samefile(installed, os.path.join(cache_dir, self.XPI_NAME))
+
+    def test_link_failure_falls_back_to_copy(self, env, tmp_path):
+        """If hard links are unavailable the XPI should be copied."""
+        mgr, cache_dir = env
+        with mock.patch('urllib.request.urlopen', return_value=FakeHTTPResponse(b"xpi-v1")), \
+                mock.patch('os.link', side_effect=OSError("cross-device link")):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+
+        installed = os.path.join(str(tmp_path / "p1"), "extensions", self.XPI_NAME)
+        assert self._installed(tmp_path / "p1") == b"xpi-v1"
+        assert not os.path.samefile(installed, os.path.join(cache_dir, self.XPI_NAME))
+
+    def test_network_failure_without_cache(self, env, tmp_path):
+        """With no cache and no network the extension is skipped, not fatal."""
+        mgr, cache_dir = env
+        with mock.patch('urllib.request.urlopen', side_effect=urllib.error.URLError("offline")):
+            mgr._install_ublock_origin(str(tmp_path / "p1"))
+
+        assert self._installed(tmp_path / "p1") is None
+
+
+
+# ---------------------------------------------------------------------------
+# Event pattern matching
+# ---------------------------------------------------------------------------
+
+class TestPatternMatching:
+    """Test _dictionaries_match (compiled pattern matching)."""
+
+    @pytest.fixture
+    def mgr(self):
+        """Manager without a WebSocket (matching needs none)."""
+        return make_manager(None)
+
+    EVENT = {"context": "ctx-1", "navigation": "nav-1",
+             "url": "https://example.com/path/", "request": {"method": "GET", "headers": {}}}
+
+    @pytest.mark.parametrize("pattern", [
+        {},
+        {"context": "ctx-1"},
+        {"url": "https:example.compath"},
+        {"request": {"method": "GET"}},
+        {"request": {}},
+        {"missing": "ignored when not required"},
+    ])
+    def test_matches(self, mgr, pattern):
+        """Equal values (up to slashes) and absent keys should match."""
+        assert mgr._dictionaries_match(pattern, self.EVENT, False)
+
+    @pytest.mark.parametrize("pattern", [
+        {"context": "ctx-2"},
+        {"request": {"method": "POST"}},
+        {"context": "ctx-1", "navigation": "nav-2"},
+    ])
+    def test_mismatches(self, mgr, pattern):
+        """Any differing leaf should fail the match."""
+        assert not mgr._dictionaries_match(pattern, self.EVENT, False)
+
+    def test_required_keys(self, mgr):
+        """With required=True, missing keys (at any depth) should fail."""
+        assert mgr._dictionaries_match({"request": {"method": "GET"}}, self.EVENT, True)
+        assert not mgr._dictionaries_match({"missing": 1}, self.EVENT, True)
+        assert not mgr._dictionaries_match({"request": {"body": 1}}, self.EVENT, True)
+        assert not mgr._dictionaries_match({"context": {"nested": 1}}, self.EVENT, True)
+
+    def test_non_string_values_compare_as_strings(self, mgr):
+        """Numbers should compare by their string form, as before."""
+        assert mgr._dictionaries_match({"status": 200}, {"status": "200"}, True)
+
+
+
+# ---------------------------------------------------------------------------
+# Startup readiness probe
+# ---------------------------------------------------------------------------
+
+class TestWaitForPort:
+    """Test _wait_for_port, which replaces the fixed startup sleep."""
+
+    @staticmethod
+    def _manager(port, exit_code=None):
+        """Manager on the given port with a mock process."""
+        mgr = FirefoxExecutionManager(port=port)
+        mgr.process = mock.Mock()
+        mgr.process.poll.return_value = exit_code
+        return mgr
+
+    @staticmethod
+    def _unused_port():
+        """A localhost port with nothing listening on it."""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def test_returns_when_listening(self):
+        """An open port should be detected without waiting out the timeout."""
+        with socket.socket() as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen(1)
+            mgr = self._manager(server.getsockname()[1])
+            start = time.monotonic()
+            assert mgr._wait_for_port(5) is True
+            assert time.monotonic() - start < 1
+
+    def test_times_out_when_closed(self):
+        """A port that never opens should give up after the timeout."""
+        mgr = self._manager(self._unused_port())
+        start = time.monotonic()
+        assert mgr._wait_for_port(0.3) is False
+        assert time.monotonic() - start < 2
+
+    def test_stops_when_process_exits(self):
+        """A dead Firefox process should end the wait immediately."""
+        mgr = self._manager(self._unused_port(), exit_code=1)
+        start = time.monotonic()
+        assert mgr._wait_for_port(10) is False
+        assert time.monotonic() - start < 1
+
+
+
+# ---------------------------------------------------------------------------
+# Shutdown
+# ---------------------------------------------------------------------------
+
+class TestWaitForProcessExit:
+    """Test _wait_for_process_exit with a real child process."""
+
+    def _manager(self, seconds):
+        """A manager whose process is a Python child sleeping for seconds."""
+        mgr = make_manager(None)
+        mgr.process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep({})".format(seconds)])
+        return mgr
+
+    def test_returns_when_process_exits(self):
+        """The wait should end and reap the process once it exits."""
+        mgr = self._manager(0.2)
+        mgr._wait_for_process_exit(10)
+        assert mgr.process.returncode == 0
+
+    def test_times_out_while_running(self):
+        """A process that outlives the timeout should raise TimeoutExpired."""
+        mgr = self._manager(30)
+        try:
+            with pytest.raises(subprocess.TimeoutExpired):
+                mgr._wait_for_process_exit(0.1)
+            assert mgr.process.poll() is None
+        finally:
+            mgr.process.kill()
+            mgr.process.wait()
+
+    def test_already_reaped_process(self):
+        """A process that was already reaped should return immediately."""
+        mgr = self._manager(0)
+        mgr.process.wait()
+        mgr._wait_for_process_exit(0.1)
+        assert mgr.process.returncode == 0
+
+
+# ---------------------------------------------------------------------------
+# Firefox stderr
+# ---------------------------------------------------------------------------
+
+class TestStderrDrain:
+    """Test that Firefox's stderr is drained and its tail kept for errors."""
+
+    def test_large_output_does_not_block(self):
+        """A child writing far more than a pipe buffer should run to completion."""
+        mgr = make_manager(None)
+        script = "import sys\nfor i in range(5000): sys.stderr.write('line %04d %s\\n' % (i, 'x' * 60))"
+        mgr.process = subprocess.Popen([sys.executable, "-c", script],
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        mgr._stderr_tail = collections.deque(maxlen=2)
+        mgr._stderr_thread = threading.Thread(target=mgr._drain_stderr,
+                                              args=(mgr.process.stderr, mgr._stderr_tail), daemon=True)
+        mgr._stderr_thread.start()
+
+        mgr._wait_for_process_exit(10)
+        lines = mgr._recent_stderr().splitlines()
+        assert [line[:9] for line in lines] == ["line 4998", "line 4999"]
+
+    def test_unreadable_stream_ends_quietly(self):
+        """Streams that can't be iterated or closed should just end the drain."""
+        tail = collections.deque(maxlen=2)
+        FirefoxExecutionManager._drain_stderr(mock.Mock(), tail)
+        assert list(tail) == []
+
+    def test_no_stderr_pipe_starts_no_thread(self, tmp_path):
+        """A process without a stderr pipe should not get a drain thread."""
+        mgr = FirefoxExecutionManager(port=9345, profile_dir=str(tmp_path))
+        mgr._firefox_path = "firefox"
+        process = mock.Mock(stderr=None)
+        process.poll.return_value = None
+        with mock.patch.object(mgr, '_install_ublock_origin'), \
+                mock.patch('subprocess.Popen', return_value=process), \
+                mock.patch.object(mgr, '_wait_for_port', return_value=True):
+            mgr.start_firefox()
+        assert mgr._stderr_thread is None
+        assert mgr._recent_stderr() == ""
+
+    def test_startup_failure_reports_stderr(self, tmp_path):
+        """A binary that exits at once should have its stderr in the startup error."""
+        mgr = FirefoxExecutionManager(port=9345, profile_dir=str(tmp_path))
+        mgr._firefox_path = sys.executable  # Rejects Firefox's options and exits
+        with mock.patch.object(mgr, '_install_ublock_origin'):
+            with pytest.raises(FirefoxStartupException, match="unknown option|usage"):
+                mgr.start_firefox()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -23,6 +23,11 @@ def test_firefox_execution_manager_import():
     from FirefoxController import FirefoxExecutionManager
     assert FirefoxExecutionManager is not None
 
+def test_firefox_pool_import():
+    """Test that FirefoxPool can be imported"""
+    from FirefoxController import FirefoxPool
+    assert FirefoxPool is not None
+
 def test_exceptions_import():
     """Test that all exceptions can be imported"""
     from FirefoxController import (
@@ -46,6 +51,19 @@ def test_exceptions_import():
     assert FirefoxNavigateTimedOut is not None
     assert FirefoxResponseNotReceived is not None
 
+def test_webdriver_patch_exports_import():
+    """Test that the lazily imported webdriver patch names resolve"""
+    from FirefoxController import WebDriverPatchError, check_and_raise_if_needed
+    from FirefoxController.webdriver_patch import WebDriverPatchError as direct_error
+    assert WebDriverPatchError is direct_error
+    assert callable(check_and_raise_if_needed)
+
+def test_unknown_attribute_raises():
+    """Test that unknown package attributes still raise AttributeError"""
+    import FirefoxController
+    with pytest.raises(AttributeError):
+        FirefoxController.NoSuchThing
+
 def test_utility_functions_import():
     """Test that utility functions can be imported"""
     from FirefoxController import setup_logging, main
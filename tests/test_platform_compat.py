@@ -7,6 +7,7 @@ These tests verify platform-specific code paths without requiring
 a running Firefox instance (uses mocking where needed).
 """
 
+import io
 import pytest
 import sys
 import os
@@ -192,8 +193,10 @@ class TestVersionEnforcement:
                     with mock.patch('subprocess.Popen') as mock_popen:
                         mock_proc = mock.Mock()
                         mock_proc.poll.return_value = None
+                        mock_proc.stderr = io.BytesIO(b"")
                         mock_popen.return_value = mock_proc
-                        with mock.patch('time.sleep'):
+                        with mock.patch('time.sleep'), \
+                                mock.patch.object(mgr, '_wait_for_port', return_value=True):
                             mgr.start_firefox()
                         # Should have gotten past the version check
                         assert mgr.process is not None
@@ -207,11 +210,49 @@ class TestVersionEnforcement:
                     with mock.patch('subprocess.Popen') as mock_popen:
                         mock_proc = mock.Mock()
                         mock_proc.poll.return_value = None
+                        mock_proc.stderr = io.BytesIO(b"")
                         mock_popen.return_value = mock_proc
-                        with mock.patch('time.sleep'):
+                        with mock.patch('time.sleep'), \
+                                mock.patch.object(mgr, '_wait_for_port', return_value=True):
                             mgr.start_firefox()
                         assert mgr.process is not None
 
+    def test_binary_checked_once_per_manager(self):
+        """Restarting Firefox should reuse the resolved, version-checked binary."""
+        mgr = FirefoxExecutionManager()
+        with mock.patch.object(mgr, '_find_firefox_binary', return_value="firefox") as find_binary:
+            with mock.patch.object(mgr, '_get_firefox_version', return_value=148) as get_version:
+                with mock.patch.object(mgr, '_create_profile', return_value="/tmp/profile"):
+                    with mock.patch('subprocess.Popen') as mock_popen:
+                        mock_proc = mock.Mock()
+                        mock_proc.poll.return_value = None
+                        mock_proc.stderr = io.BytesIO(b"")
+                        mock_popen.return_value = mock_proc
+                        with mock.patch('time.sleep'), \
+                                mock.patch.object(mgr, '_wait_for_port', return_value=True):
+                            mgr.start_firefox()
+                            mgr.start_firefox()
+                        assert mock_popen.call_count == 2
+                        assert mock_popen.call_args[0][0][0] == "firefox"
+        find_binary.assert_called_once()
+        get_version.assert_called_once()
+
+    def test_version_cached_across_managers(self, tmp_path):
+        """Managers using the same unchanged binary should run --version once."""
+        binary = tmp_path / "firefox"
+        binary.write_text("#!/bin/sh\n")
+        with mock.patch.dict(FirefoxExecutionManager._version_cache, clear=True), \
+                mock.patch.object(FirefoxExecutionManager, '_get_firefox_version',
+                                  return_value=148) as get_version:
+            for _ in range(3):
+                assert FirefoxExecutionManager()._cached_firefox_version(str(binary)) == 148
+            get_version.assert_called_once()
+
+            # A replaced (upgraded) binary should be checked again
+            binary.write_text("#!/bin/sh\n# upgraded\n")
+            assert FirefoxExecutionManager()._cached_firefox_version(str(binary)) == 148
+            assert get_version.call_count == 2
+
 
 # ---------------------------------------------------------------------------
 # Process startup platform kwargs
@@ -228,8 +269,10 @@ class TestStartFirefoxPlatformKwargs:
                     with mock.patch('subprocess.Popen') as mock_popen:
                         mock_proc = mock.Mock()
                         mock_proc.poll.return_value = None
+                        mock_proc.stderr = io.BytesIO(b"")
                         mock_popen.return_value = mock_proc
-                        with mock.patch('time.sleep'):
+                        with mock.patch('time.sleep'), \
+                                mock.patch.object(mgr, '_wait_for_port', return_value=True):
                             mgr.start_firefox()
                         return mock_popen
 
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+
+"""
+Unit tests for FirefoxPool.
+
+These tests do not require a running Firefox instance (the execution
+managers are replaced with mocks).
+"""
+
+import threading
+
+import pytest
+from unittest import mock
+
+from FirefoxController import pool as pool_module
+from FirefoxController.execution_manager import FirefoxExecutionManager
+from FirefoxController.pool import FirefoxPool
+from FirefoxController.exceptions import BrowserTimeoutError, FirefoxControllerException
+
+
+def make_fake_manager(**kwargs):
+    """A stand-in for a started, connected FirefoxExecutionManager."""
+    manager = mock.Mock()
+    manager.process.poll.return_value = None
+    manager.browsing_context = "ctx-default"
+    manager.tabs = {"ctx-default": object(), "ctx-1": object()}
+    manager.event_queues = {"ctx-1": object()}
+    manager.event_queues_lock = threading.Lock()
+    manager.console_queues = {"ctx-1": object()}
+    manager.console_queues_lock = threading.Lock()
+    manager.close_tabs.return_value = True
+    manager.network_logging_refs = manager.console_logging_refs = 0
+    manager.network_events_subscribed = manager.console_events_subscribed = False
+    manager.logging_enabled_contexts, manager.console_enabled_contexts = set(), set()
+    manager._logging_interfaces, manager._console_interfaces = [], []
+    manager.kwargs = kwargs
+    return manager
+
+
+@pytest.fixture
+def fake_managers():
+    """Patch the pool to create fake managers; yields the list of those created."""
+    created = []
+
+    def factory(**kwargs):
+        manager = make_fake_manager(**kwargs)
+        created.append(manager)
+        return manager
+
+    with mock.patch.object(pool_module, 'FirefoxExecutionManager', side_effect=factory):
+        yield created
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+class TestPoolConfiguration:
+    """Test FirefoxPool argument checking."""
+
+    def test_rejects_fixed_port(self):
+        """Instances can't share a debug port."""
+        with pytest.raises(ValueError, match="port"):
+            FirefoxPool(port=9222)
+
+    def test_rejects_shared_profile(self):
+        """Instances can't share a profile directory."""
+        with pytest.raises(ValueError, match="profile_dir"):
+            FirefoxPool(profile_dir="/tmp/profile")
+
+    def test_rejects_empty_pool(self):
+        """A pool must hold at least one instance."""
+        with pytest.raises(ValueError):
+            FirefoxPool(size=0)
+
+    def test_instances_use_temporary_profiles(self, fake_managers):
+        """Each instance should be started with its own temporary profile."""
+        pool = FirefoxPool(headless=True)
+        pool.acquire()
+        assert fake_managers[0].kwargs == {'headless': True, 'temporary_profile': True}
+        fake_managers[0].start_firefox.assert_called_once()
+        fake_managers[0].connect.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Acquire / release
+# ---------------------------------------------------------------------------
+
+class TestPoolReuse:
+    """Test that released instances are reset and handed out again."""
+
+    def test_released_instance_is_reused(self, fake_managers):
+        """A second session should get the same running instance."""
+        pool = FirefoxPool(size=1)
+        with pool.session() as first:
+            pass
+        with pool.session() as second:
+            pass
+        assert first is second
+        assert len(fake_managers) == 1
+        first.close.assert_not_called()
+
+    def test_release_resets_state(self, fake_managers):
+        """Releasing should close extra tabs, blank the default tab and drop queued events."""
+        pool = FirefoxPool(size=1)
+        manager = pool.acquire()
+        pool.release(manager)
+
+        manager._list_browsing_contexts.assert_called_once()
+        manager.close_tabs.assert_called_once_with(["ctx-1"])
+        message = manager._send_message.call_args[0][0]
+        assert message['method'] == 'browsingContext.navigate'
+        assert message['params']['url'] == 'about:blank'
+        assert message['params']['context'] == 'ctx-default'
+        assert manager.event_queues == {}
+        assert manager.console_queues == {}
+
+    def test_reset_keeps_default_tab_of_real_manager(self):
+        """The real tab bookkeeping should keep the default tab and blank it."""
+        manager = FirefoxExecutionManager(port=9222)
+        manager.process = mock.Mock()
+        manager.process.poll.return_value = None
+        manager.ws_connection = mock.Mock()
+        manager.browsing_context = "ctx-default"
+        for tab_id in ("ctx-default", "ctx-1", "ctx-2"):
+            manager._track_tab(tab_id, {"actor": tab_id, "url": "https://example.com/"})
+            manager.tabs[tab_id] = object()
+
+        def refresh():
+            # A window.open() popup the previous session never tracked
+            manager._track_tab("ctx-popup", {"actor": "ctx-popup", "url": "about:blank"})
+            manager.tabs["ctx-popup"] = object()
+
+        with mock.patch.object(manager, '_list_browsing_contexts', side_effect=refresh), \
+                mock.patch.object(manager, '_send_messages') as send_messages, \
+                mock.patch.object(manager, '_send_message') as send_message:
+            assert FirefoxPool(size=1)._reset_manager(manager)
+
+        closed = [m['params']['context'] for m in send_messages.call_args[0][0]]
+        assert closed == ["ctx-1", "ctx-2", "ctx-popup"]
+        assert list(manager.tabs) == ["ctx-default"]
+        assert manager.browsing_context == "ctx-default"
+        navigate = send_message.call_args[0][0]
+        assert navigate['params'] == {'context': 'ctx-default', 'url': 'about:blank', 'wait': 'complete'}
+
+    def test_failed_tab_close_replaces_instance(self, fake_managers):
+        """An instance whose extra tabs couldn't be closed should not be reused."""
+        pool = FirefoxPool(size=1)
+        with pool.session() as manager:
+            manager.close_tabs.return_value = False
+        manager.close.assert_called_once()
+        manager._send_message.assert_not_called()
+
+    @pytest.mark.parametrize("attribute, value", [
+        ("network_logging_refs", 1),
+        ("network_events_subscribed", True),
+        ("console_logging_refs", 1),
+        ("console_events_subscribed", True),
+        ("console_enabled_contexts", {"ctx-1"}),
+        ("_console_interfaces", [object()]),
+    ])
+    def test_logging_left_enabled_replaces_instance(self, fake_managers, attribute, value):
+        """Subscriptions and logging state must not leak into the next session."""
+        pool = FirefoxPool(size=1)
+        with pool.session() as manager:
+            setattr(manager, attribute, value)
+        with pool.session() as replacement:
+            pass
+        assert replacement is not manager
+        manager.close.assert_called_once()
+
+    def test_instance_dying_while_idle_is_replaced(self, fake_managers):
+        """acquire() should skip an idle instance whose Firefox has exited."""
+        pool = FirefoxPool(size=1)
+        with pool.session() as manager:
+            pass
+        manager.process.poll.return_value = 0
+
+        with pool.session() as replacement:
+            pass
+        assert replacement is not manager
+        manager.close.assert_called_once()
+
+    def test_max_uses_recycles_instance(self, fake_managers):
+        """An instance should be closed and replaced after max_uses sessions."""
+        pool = FirefoxPool(size=1, max_uses=2)
+        for _ in range(3):
+            with pool.session():
+                pass
+        assert len(fake_managers) == 2
+        fake_managers[0].close.assert_called_once()
+        fake_managers[1].close.assert_not_called()
+
+    def test_dead_instance_is_replaced(self, fake_managers):
+        """An instance whose Firefox exited should not go back into the pool."""
+        pool = FirefoxPool(size=1)
+        with pool.session() as manager:
+            manager.process.poll.return_value = 0
+        with pool.session() as replacement:
+            pass
+        assert replacement is not manager
+        manager.close.assert_called_once()
+
+    def test_failed_reset_closes_instance(self, fake_managers):
+        """An instance that can't be reset should be closed."""
+        pool = FirefoxPool(size=1)
+        with pool.session() as manager:
+            manager._send_message.side_effect = FirefoxControllerException("gone")
+        manager.close.assert_called_once()
+        assert pool.acquire(timeout=0) is not manager
+
+
+# ---------------------------------------------------------------------------
+# Limits and shutdown
+# ---------------------------------------------------------------------------
+
+class TestPoolLimits:
+    """Test the size limit and closing the pool."""
+
+    def test_acquire_times_out_when_exhausted(self, fake_managers):
+        """acquire() should time out when every instance is checked out."""
+        pool = FirefoxPool(size=1)
+        pool.acquire()
+        with pytest.raises(BrowserTimeoutError):
+            pool.acquire(timeout=0.05)
+
+    def test_failed_start_frees_slot(self, fake_managers):
+        """A failed start should not use up a slot."""
+        pool = FirefoxPool(size=1)
+        with mock.patch.object(pool_module, 'FirefoxExecutionManager') as manager_class:
+            manager_class.return_value.connect.side_effect = FirefoxControllerException("no BiDi")
+            with pytest.raises(FirefoxControllerException):
+                pool.acquire(timeout=0)
+            manager_class.return_value.close.assert_called_once()
+        assert pool.acquire(timeout=0) is not None
+
+    def test_failed_startup_closes_manager(self, fake_managers):
+        """A Firefox that fails to start should still have its profile and process cleaned up."""
+        pool = FirefoxPool(size=1)
+        with mock.patch.object(pool_module, 'FirefoxExecutionManager') as manager_class:
+            manager_class.return_value.start_firefox.side_effect = FirefoxControllerException("too old")
+            with pytest.raises(FirefoxControllerException):
+                pool.acquire(timeout=0)
+            manager_class.return_value.close.assert_called_once()
+            manager_class.return_value.connect.assert_not_called()
+
+    def test_close_closes_idle_and_released_instances(self, fake_managers):
+        """close() should stop idle instances now and checked-out ones on release."""
+        pool = FirefoxPool(size=2)
+        idle = pool.acquire()
+        busy = pool.acquire()
+        pool.release(idle)
+
+        pool.close()
+        idle.close.assert_called_once()
+        busy.close.assert_not_called()
+
+        pool.release(busy)
+        busy.close.assert_called_once()
+        with pytest.raises(FirefoxControllerException, match="closed"):
+            pool.acquire()